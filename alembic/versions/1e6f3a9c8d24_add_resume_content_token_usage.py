@@ -0,0 +1,28 @@
+"""add resume content token usage
+
+Revision ID: 1e6f3a9c8d24
+Revises: 7b2e9d05c3f1
+Create Date: 2026-10-17 19:26:03.517442
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '1e6f3a9c8d24'
+down_revision: Union[str, Sequence[str], None] = '7b2e9d05c3f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_content', sa.Column('token_usage', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resume_content', 'token_usage')
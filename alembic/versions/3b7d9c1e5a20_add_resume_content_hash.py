@@ -0,0 +1,52 @@
+"""add resume content hash
+
+Revision ID: 3b7d9c1e5a20
+Revises: aef8fc02e024
+Create Date: 2026-10-17 09:12:40.118302
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9c1e5a20'
+down_revision: Union[str, Sequence[str], None] = 'aef8fc02e024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The resume table predates the migration history on some databases.
+    if not sa.inspect(op.get_bind()).has_table('resume'):
+        op.create_table('resume',
+        sa.Column('id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('fullname', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('email', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('phone', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('address', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('category', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('summary', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('raw_resume', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('file_name', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('file_path', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', name='resumestatus'), nullable=False),
+        sa.Column('skills', sa.JSON(), nullable=True),
+        sa.Column('strength', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.add_column('resume', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_resume_content_hash'), 'resume', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_resume_content_hash'), table_name='resume')
+    op.drop_column('resume', 'content_hash')
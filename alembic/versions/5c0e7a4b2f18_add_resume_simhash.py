@@ -0,0 +1,40 @@
+"""add resume simhash
+
+Revision ID: 5c0e7a4b2f18
+Revises: 1e6f3a9c8d24
+Create Date: 2026-10-17 20:41:37.208561
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e7a4b2f18'
+down_revision: Union[str, Sequence[str], None] = '1e6f3a9c8d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    op.add_column('resume', sa.Column('simhash_bands', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.add_column('resume', sa.Column('duplicate_of', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index('ix_resume_simhash_bands', 'resume', ['simhash_bands'], unique=False, postgresql_using='gin')
+    op.create_index(op.f('ix_resume_duplicate_of'), 'resume', ['duplicate_of'], unique=False)
+    op.create_foreign_key('resume_duplicate_of_fkey', 'resume', 'resume', ['duplicate_of'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('resume_duplicate_of_fkey', 'resume', type_='foreignkey')
+    op.drop_index(op.f('ix_resume_duplicate_of'), table_name='resume')
+    op.drop_index('ix_resume_simhash_bands', table_name='resume', postgresql_using='gin')
+    op.drop_column('resume', 'duplicate_of')
+    op.drop_column('resume', 'simhash_bands')
+    op.drop_column('resume', 'simhash')
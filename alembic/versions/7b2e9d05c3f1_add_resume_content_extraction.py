@@ -0,0 +1,28 @@
+"""add resume content extraction
+
+Revision ID: 7b2e9d05c3f1
+Revises: d4c1f8a2b937
+Create Date: 2026-10-17 18:40:27.915604
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e9d05c3f1'
+down_revision: Union[str, Sequence[str], None] = 'd4c1f8a2b937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_content', sa.Column('extraction', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resume_content', 'extraction')
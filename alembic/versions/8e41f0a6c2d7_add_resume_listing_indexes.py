@@ -0,0 +1,30 @@
+"""add resume listing indexes
+
+Revision ID: 8e41f0a6c2d7
+Revises: 3b7d9c1e5a20
+Create Date: 2026-10-17 11:03:52.640118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41f0a6c2d7'
+down_revision: Union[str, Sequence[str], None] = '3b7d9c1e5a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_resume_created_at_id', 'resume', ['created_at', 'id'], unique=False)
+    op.create_index('ix_resume_status_created_at_id', 'resume', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_resume_category_created_at_id', 'resume', ['category', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resume_category_created_at_id', table_name='resume')
+    op.drop_index('ix_resume_status_created_at_id', table_name='resume')
+    op.drop_index('ix_resume_created_at_id', table_name='resume')
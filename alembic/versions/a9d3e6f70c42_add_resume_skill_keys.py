@@ -0,0 +1,73 @@
+"""add resume skill keys
+
+Revision ID: a9d3e6f70c42
+Revises: f2b7c4d81e53
+Create Date: 2026-10-17 17:15:44.902316
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e6f70c42'
+down_revision: Union[str, Sequence[str], None] = 'f2b7c4d81e53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.utils.skills.SKILL_ALIASES as of this revision, so later alias edits do not change it.
+SKILL_ALIASES = {
+    'golang': 'go',
+    'postgresql': 'postgres',
+    'psql': 'postgres',
+    'k8s': 'kubernetes',
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'py': 'python',
+    'python3': 'python',
+    'ml': 'machine learning',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume', sa.Column('skill_keys', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False))
+
+    # Same canonicalization as app.utils.skills.canonicalize_skills: trim, lowercase, collapse whitespace, map aliases.
+    alias_rows = ", ".join(f"('{alias}', '{canonical}')" for alias, canonical in SKILL_ALIASES.items())
+    op.execute(
+        f"""
+        UPDATE resume SET skill_keys = coalesce((
+            SELECT jsonb_agg(DISTINCT coalesce(aliases.canonical, skill.key))
+            FROM (
+                SELECT lower(regexp_replace(trim(value), '\\s+', ' ', 'g')) AS key
+                FROM json_array_elements_text(resume.skills)
+            ) AS skill
+            LEFT JOIN (VALUES {alias_rows}) AS aliases (alias, canonical) ON aliases.alias = skill.key
+            WHERE skill.key <> ''
+        ), '[]'::jsonb)
+        WHERE resume.skills IS NOT NULL
+        """
+    )
+    op.create_index('ix_resume_skill_keys', 'resume', ['skill_keys'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resume_skill_keys', table_name='resume', postgresql_using='gin')
+    op.drop_column('resume', 'skill_keys')
@@ -0,0 +1,47 @@
+"""move resume text to resume_content
+
+Revision ID: c5a8e2d94b16
+Revises: 8e41f0a6c2d7
+Create Date: 2026-10-17 13:27:09.512873
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a8e2d94b16'
+down_revision: Union[str, Sequence[str], None] = '8e41f0a6c2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resume_content',
+    sa.Column('resume_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('raw_resume', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('summary', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resume.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('resume_id')
+    )
+    op.execute(
+        "INSERT INTO resume_content (resume_id, raw_resume, summary) "
+        "SELECT id, raw_resume, summary FROM resume"
+    )
+    op.drop_column('resume', 'raw_resume')
+    op.drop_column('resume', 'summary')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('resume', sa.Column('summary', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('resume', sa.Column('raw_resume', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.execute(
+        "UPDATE resume SET raw_resume = resume_content.raw_resume, summary = resume_content.summary "
+        "FROM resume_content WHERE resume_content.resume_id = resume.id"
+    )
+    op.drop_table('resume_content')
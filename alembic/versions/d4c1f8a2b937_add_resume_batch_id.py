@@ -0,0 +1,31 @@
+"""add resume batch id
+
+Revision ID: d4c1f8a2b937
+Revises: a9d3e6f70c42
+Create Date: 2026-10-17 18:02:11.438120
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4c1f8a2b937'
+down_revision: Union[str, Sequence[str], None] = 'a9d3e6f70c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume', sa.Column('batch_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_resume_batch_id'), 'resume', ['batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_resume_batch_id'), table_name='resume')
+    op.drop_column('resume', 'batch_id')
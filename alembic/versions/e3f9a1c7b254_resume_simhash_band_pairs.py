@@ -0,0 +1,50 @@
+"""resume simhash band pairs
+
+Revision ID: e3f9a1c7b254
+Revises: 5c0e7a4b2f18
+Create Date: 2026-10-17 23:12:08.417395
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f9a1c7b254'
+down_revision: Union[str, Sequence[str], None] = '5c0e7a4b2f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same keys as app.utils.simhash.simhash_bands as of this revision: one per pair of
+    # 8-bit bands a < b, (a * 8 + b) << 16 | band a << 8 | band b.
+    op.execute(
+        """
+        UPDATE resume SET simhash_bands = ARRAY(
+            SELECT (
+                ((band_a * 8 + band_b)::bigint << 16)
+                | (((simhash >> (band_a * 8)) & 255) << 8)
+                | ((simhash >> (band_b * 8)) & 255)
+            )::integer
+            FROM generate_series(0, 7) AS band_a, generate_series(0, 7) AS band_b
+            WHERE band_a < band_b
+            ORDER BY band_a, band_b
+        )
+        WHERE simhash IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    # Single 8-bit bands, band << 8 | value, as in revision 5c0e7a4b2f18.
+    op.execute(
+        """
+        UPDATE resume SET simhash_bands = ARRAY(
+            SELECT ((band::bigint << 8) | ((simhash >> (band * 8)) & 255))::integer
+            FROM generate_series(0, 7) AS band
+            ORDER BY band
+        )
+        WHERE simhash IS NOT NULL
+        """
+    )
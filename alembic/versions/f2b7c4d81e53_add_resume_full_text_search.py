@@ -0,0 +1,43 @@
+"""add resume full text search
+
+Revision ID: f2b7c4d81e53
+Revises: c5a8e2d94b16
+Create Date: 2026-10-17 15:40:18.273541
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c4d81e53'
+down_revision: Union[str, Sequence[str], None] = 'c5a8e2d94b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_content', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(
+        """
+        UPDATE resume_content SET search_vector =
+            setweight(to_tsvector('english', coalesce((
+                SELECT string_agg(skill, ' ') FROM json_array_elements_text(resume.skills) AS skill
+            ), '')), 'A')
+            || setweight(to_tsvector('english', coalesce(resume_content.summary, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(resume_content.raw_resume, '')), 'C')
+        FROM resume
+        WHERE resume.id = resume_content.resume_id
+        """
+    )
+    op.create_index('ix_resume_content_search_vector', 'resume_content', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resume_content_search_vector', table_name='resume_content', postgresql_using='gin')
+    op.drop_column('resume_content', 'search_vector')
@@ -4,5 +4,12 @@ from app.core.settings import settings
 
 app = Celery("tasks", broker=settings.database_settings.REDIS_URL, backend=settings.database_settings.REDIS_URL)
 app.autodiscover_tasks(["app.tasks"])
+app.conf.task_routes = {
+    "resume.ocr": {"queue": "ocr"},
+    "resume.analyze": {"queue": "llm"},
+    "resume.persist": {"queue": "db"},
+    "resume.index": {"queue": "vector"},
+}
 
+from app.services.resume import resume_tasks  # noqa
 from app.tasks import example_tasks  # noqa
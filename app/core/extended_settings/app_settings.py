@@ -12,4 +12,11 @@ class AppSettings(BaseSettings):
     ALLOW_METHODS: list[str] = ["*"]
     ALLOW_HEADERS: list[str] = ["*"]
 
+    UPLOAD_DIR: str = "public/resumes"
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    UPLOAD_MAX_ARCHIVE_BYTES: int = 500 * 1024 * 1024
+    UPLOAD_MAX_BATCH_BYTES: int = 1024 * 1024 * 1024
+    BULK_UPLOAD_MAX_FILES: int = 500
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
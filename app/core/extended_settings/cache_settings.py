@@ -0,0 +1,24 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class CacheSettings(BaseSettings):
+    """Result cache settings"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    CACHE_DIR: str = ".cache"
+    CACHE_REDIS_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024
+
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    OCR_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_VERSION: int = 1
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+
+    QUERY_EMBEDDING_CACHE_SIZE: int = 2048
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    QUERY_RESULT_CACHE_SIZE: int = 512
+    QUERY_RESULT_CACHE_TTL_SECONDS: int = 60
@@ -0,0 +1,14 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class DedupSettings(BaseSettings):
+    """Near-duplicate resume detection settings"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    DEDUP_ENABLED: bool = True
+    # Resumes whose SimHash fingerprints differ in at most this many of 64 bits are near-duplicates.
+    # Candidates share two of eight 8-bit bands, so matches are only guaranteed up to 6.
+    DEDUP_MAX_HAMMING_DISTANCE: int = 6
+    # Most candidates compared for one resume.
+    DEDUP_MAX_CANDIDATES: int = 200
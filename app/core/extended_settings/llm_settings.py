@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,3 +11,29 @@ class LLMSettings(BaseSettings):
     OPENAI_BASE_URL: str = ""
     MISTRAL_API_KEY: str = ""
     TAVILY_API_KEY: str = ""
+
+    LLM_STAGE_CONCURRENCY: int = 32
+    LLM_ANALYSIS_MODE: Literal["two_call", "single_pass"] = "two_call"
+
+    # Model per task. Extraction runs on the cheap model and is retried on the escalation
+    # model when its output fails validation or reports confidence below the threshold.
+    LLM_SUMMARY_MODEL: str = "gpt-4o"
+    LLM_EXTRACT_MODEL: str = "gpt-4o-mini"
+    LLM_EXTRACT_ESCALATION_MODEL: str = "gpt-4o"
+    LLM_EXTRACT_MIN_CONFIDENCE: float = 0.6
+    LLM_ANALYZE_MODEL: str = "gpt-4o"
+
+    LLM_TEXT_PREP_ENABLED: bool = True
+    LLM_SUMMARY_MAX_INPUT_TOKENS: int = 6000
+    LLM_EXTRACT_MAX_INPUT_TOKENS: int = 4000
+    LLM_ANALYZE_MAX_INPUT_TOKENS: int = 6000
+
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_CONNECT_TIMEOUT: float = 10.0
+    LLM_READ_TIMEOUT: float = 120.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BACKOFF_INITIAL_MS: int = 500
+    LLM_RETRY_BACKOFF_MAX_MS: int = 30_000
+    LLM_RETRY_MAX_ELAPSED_MS: int = 120_000
@@ -0,0 +1,14 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class OCRSettings(BaseSettings):
+    """PDF text extraction settings"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    OCR_TEXT_LAYER_ENABLED: bool = True
+    OCR_MIN_PAGE_CHARS: int = 200
+    OCR_INCLUDE_IMAGE_BASE64: bool = False
+    OCR_PAGES_PER_REQUEST: int = 8
+    OCR_MAX_CONCURRENCY: int = 4
+    OCR_INLINE_MAX_BYTES: int = 20 * 1024 * 1024
@@ -0,0 +1,25 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class RateLimitSettings(BaseSettings):
+    """Provider quota settings shared by every API and worker process"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    RATE_LIMIT_ENABLED: bool = True
+    # Quotas per "provider:model": requests per minute, tokens per minute and concurrent requests. 0 disables a limit.
+    RATE_LIMITS: dict[str, dict[str, int]] = {
+        "openai:gpt-4o": {"rpm": 500, "tpm": 30_000, "concurrency": 50},
+        "openai:gpt-4o-mini": {"rpm": 500, "tpm": 200_000, "concurrency": 50},
+        "openai:text-embedding-3-small": {"rpm": 3_000, "tpm": 1_000_000, "concurrency": 50},
+        "mistral:mistral-ocr-latest": {"rpm": 60, "tpm": 0, "concurrency": 10},
+    }
+    RATE_LIMIT_DEFAULT: dict[str, int] = {"rpm": 60, "tpm": 0, "concurrency": 10}
+
+    RATE_LIMIT_DECREASE_FACTOR: float = 0.5
+    RATE_LIMIT_RECOVERY_STEP: float = 0.02
+    RATE_LIMIT_MIN_FACTOR: float = 0.1
+    RATE_LIMIT_RETRY_AFTER_DEFAULT_SECONDS: float = 1.0
+    RATE_LIMIT_LEASE_TTL_SECONDS: int = 300
+    RATE_LIMIT_POLL_MS: int = 50
+    RATE_LIMIT_OUTPUT_TOKENS_ESTIMATE: int = 1024
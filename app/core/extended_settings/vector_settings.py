@@ -0,0 +1,22 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class VectorSettings(BaseSettings):
+    """Vector store settings"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    CHROMA_PATH: str = "./chroma_db"
+    CHROMA_COLLECTION: str = "resumes"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+
+    VECTOR_BATCH_SIZE: int = 32
+    VECTOR_FLUSH_INTERVAL_SECONDS: float = 2.0
+    VECTOR_MAX_BUFFERED: int = 1024
+
+    HYBRID_CANDIDATE_MULTIPLIER: int = 3
+
+    # Job description matching: share of the score from skill overlap, the rest is embedding similarity.
+    MATCH_SKILL_WEIGHT: float = 0.3
+    MATCH_INDEX_REFRESH_SECONDS: float = 60.0
+    MATCH_INDEX_LOAD_BATCH_SIZE: int = 5000
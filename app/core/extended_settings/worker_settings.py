@@ -0,0 +1,15 @@
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class WorkerSettings(BaseSettings):
+    """Celery worker and resume pipeline settings"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    RESUME_TASK_MAX_RETRIES: int = 5
+    RESUME_TASK_RETRY_BACKOFF_MAX: int = 600
+
+    WORKER_MODE: Literal["threads", "asyncio"] = "threads"
+    WORKER_MAX_INFLIGHT: int = 64
@@ -1,10 +1,16 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from app.core.extended_settings.app_settings import AppSettings
+from app.core.extended_settings.cache_settings import CacheSettings
 from app.core.extended_settings.cors import CORSSettings
 from app.core.extended_settings.database_settings import DatabaseSettings
+from app.core.extended_settings.dedup_settings import DedupSettings
 from app.core.extended_settings.llm_settings import LLMSettings
 from app.core.extended_settings.logger_settings import LoggerSettings
+from app.core.extended_settings.ocr_settings import OCRSettings
+from app.core.extended_settings.rate_limit_settings import RateLimitSettings
+from app.core.extended_settings.vector_settings import VectorSettings
+from app.core.extended_settings.worker_settings import WorkerSettings
 
 
 class Settings(BaseSettings):
@@ -13,6 +19,12 @@ class Settings(BaseSettings):
     cors: CORSSettings = CORSSettings()
     llm: LLMSettings = LLMSettings()
     logger: LoggerSettings = LoggerSettings()
+    cache: CacheSettings = CacheSettings()
+    dedup: DedupSettings = DedupSettings()
+    ocr: OCRSettings = OCRSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
+    vector: VectorSettings = VectorSettings()
+    worker: WorkerSettings = WorkerSettings()
 
     HASHING_SECRET_KEY: str = "secret-key"
     HASHING_ALGORITHM: str = "HS256"
@@ -1,10 +1,39 @@
+import os
+
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.settings import settings
+from app.database.pool_metrics import MeteredAsyncAdaptedQueuePool, MeteredQueuePool
+
+engine = create_engine(
+    settings.database_settings.DATABASE_URL,
+    poolclass=MeteredQueuePool,
+    **settings.database_settings.get_pool_config(),
+)
+async_engine = create_async_engine(
+    settings.database_settings.ASYNC_DATABASE_URL,
+    poolclass=MeteredAsyncAdaptedQueuePool,
+    **settings.database_settings.get_pool_config(),
+)
+
+
+def _reset_pools_after_fork():
+    # Connections inherited from the parent (gunicorn --preload, Celery prefork)
+    # belong to the parent; the child starts with fresh pools and leaves them open.
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
 
-engine = create_engine(settings.database_settings.DATABASE_URL)
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
 
 
 def db_session():
     with Session(engine) as session:
         yield session
+
+
+async def async_db_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
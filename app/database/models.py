@@ -1,7 +1,8 @@
 from enum import Enum
 from typing import List, Optional
 
-from sqlmodel import JSON, Column, Field
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlmodel import JSON, BigInteger, Column, Field, Index, Integer, SQLModel
 
 from app.core.models import BaseModel
 from app.utils.generate_ids import generate_id
@@ -21,17 +22,42 @@ class ResumeStatus(str, Enum):
     COMPLETED = "completed"
 
 class Resume(BaseModel, table=True):
+    __table_args__ = (
+        Index("ix_resume_created_at_id", "created_at", "id"),
+        Index("ix_resume_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_resume_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_resume_skill_keys", "skill_keys", postgresql_using="gin"),
+        Index("ix_resume_simhash_bands", "simhash_bands", postgresql_using="gin"),
+    )
+
     fullname: Optional[str] = Field("")
     email: Optional[str] = Field("")
     phone: Optional[str] = Field("")
     address: Optional[str] = Field("")
     category: Optional[str] = Field("")
-    summary: Optional[str] = Field("")
-    raw_resume: Optional[str] = Field("")
     file_name: Optional[str] = Field("")
     file_path: Optional[str] = Field("")
+    content_hash: Optional[str] = Field(default=None, index=True)
+    batch_id: Optional[str] = Field(default=None, index=True)
+    # SimHash of the extracted text, with keys for its band pairs indexed for near-duplicate lookup.
+    simhash: Optional[int] = Field(default=None, sa_column=Column(BigInteger))
+    simhash_bands: Optional[List[int]] = Field(default=None, sa_column=Column(ARRAY(Integer)))
+    duplicate_of: Optional[str] = Field(default=None, foreign_key="resume.id", index=True, ondelete="SET NULL")
     status: ResumeStatus = Field(default=ResumeStatus.PENDING)
     skills: Optional[List[str]] = Field(default_factory=list, sa_column=Column(JSON))
+    skill_keys: List[str] = Field(default_factory=list, sa_column=Column(JSONB, nullable=False, server_default="[]"))
     strength: Optional[List[str]] = Field(default_factory=list, sa_column=Column(JSON))
 
 
+class ResumeContent(SQLModel, table=True):
+    """Bulky resume text, kept out of the frequently scanned and updated resume row."""
+
+    __tablename__ = "resume_content"  # type: ignore
+    __table_args__ = (Index("ix_resume_content_search_vector", "search_vector", postgresql_using="gin"),)
+
+    resume_id: str = Field(foreign_key="resume.id", primary_key=True, ondelete="CASCADE")
+    raw_resume: Optional[str] = Field("")
+    summary: Optional[str] = Field("")
+    extraction: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    token_usage: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    search_vector: Optional[str] = Field(default=None, sa_column=Column(TSVECTOR))
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from scalar_fastapi.scalar_fastapi import get_scalar_api_reference
@@ -7,11 +9,24 @@ from slowapi.middleware import SlowAPIMiddleware
 
 from app.core.settings import settings
 from app.router.auth_router import auth_router
+from app.router.metrics_router import metrics_router
+from app.services.resume.resume_match import resume_matrix
+from app.services.resume.resume_router import resume_router
 from app.utils.limiter import limiter
+from app.utils.upload_limit import MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware
 
 settings.logger.setup_logger()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the matching matrix in the background, so requests never wait for it.
+    resume_matrix.warm()
+    yield
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.app_settings.APP_NAME,
     version=settings.app_settings.VERSION,
     description=settings.app_settings.DESCRIPTION,
@@ -20,6 +35,13 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # type: ignore
 app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/resumes/": settings.app_settings.UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES,
+        "/resumes/batches": settings.app_settings.UPLOAD_MAX_BATCH_BYTES,
+    },
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +52,8 @@ app.add_middleware(
 )
 
 app.include_router(auth_router)
+app.include_router(resume_router)
+app.include_router(metrics_router)
 
 if settings.app_settings.DEBUG:
     from fastapi.staticfiles import StaticFiles
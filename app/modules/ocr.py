@@ -1,29 +1,204 @@
+import asyncio
+import base64
+from io import BytesIO
+from typing import Literal
+
+import anyio
+from loguru import logger
+from mistralai import Mistral
+from pydantic import BaseModel
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PyPdfError
+
+from app.core.settings import settings
+from app.utils.cache import TieredCache, hash_bytes, make_cache_key
+from app.utils.event_loop import LoopSemaphore, run_async
 from app.utils.llm_clients import mistral_client
+from app.utils.metrics import increment_counter_async
+from app.utils.rate_limiter import ProviderRateLimiter, get_rate_limiter
+
+OCR_MODEL = "mistral-ocr-latest"
+PAGE_SEPARATOR = "\n\n"
+
+ocr_cache = TieredCache(
+    namespace="ocr",
+    max_bytes=settings.cache.OCR_CACHE_MAX_BYTES,
+    ttl_seconds=settings.cache.OCR_CACHE_TTL_SECONDS,
+)
+
+
+class OCRPage(BaseModel):
+    index: int
+    text: str
+    source: Literal["text_layer", "remote_ocr"]
+
+
+class OCREngine:
+    """Extracts page text from PDFs, reading the embedded text layer first.
+
+    Scanned or low-text pages are sent to remote OCR in chunks of
+    `pages_per_request` pages, with at most `max_concurrency` requests in flight
+    per process on the shared background event loop. Documents up to
+    `inline_max_bytes` are sent inline as data URLs; larger ones go through a
+    file upload and signed URL. Every remote call goes through the shared
+    Mistral rate limiter for the model.
+    Page counts per path are recorded under the `ocr_pages` metric.
+    """
+
+    def __init__(
+        self,
+        client: Mistral,
+        model: str = OCR_MODEL,
+        include_image_base64: bool = False,
+        text_layer_enabled: bool = True,
+        min_page_chars: int = 200,
+        pages_per_request: int = 8,
+        max_concurrency: int = 4,
+        inline_max_bytes: int = 20 * 1024 * 1024,
+    ):
+        self.client = client
+        self.model = model
+        self.include_image_base64 = include_image_base64
+        self.text_layer_enabled = text_layer_enabled
+        self.min_page_chars = min_page_chars
+        self.pages_per_request = pages_per_request
+        self.inline_max_bytes = inline_max_bytes
+        self._semaphore = LoopSemaphore(max_concurrency)
+
+    @property
+    def limiter(self) -> ProviderRateLimiter:
+        return get_rate_limiter("mistral", self.model)
+
+    @property
+    def cache_parts(self) -> tuple:
+        """Options that change the extracted text, for cache keys."""
+        return (self.model, self.include_image_base64, self.text_layer_enabled, self.min_page_chars)
+
+    def extract(self, file_name: str, content: bytes) -> list[OCRPage]:
+        return run_async(self.extract_async(file_name, content))
+
+    async def extract_async(self, file_name: str, content: bytes) -> list[OCRPage]:
+        reader = await asyncio.to_thread(self._read, file_name, content)
+        if reader is None:
+            texts = await self._process(file_name, content)
+            await increment_counter_async("ocr_pages", "remote_ocr", len(texts))
+            return [OCRPage(index=index, text=text, source="remote_ocr") for index, text in sorted(texts.items())]
+
+        pages = await asyncio.to_thread(self._read_text_layer, reader)
+        low_text_pages = [page.index for page in pages if len(page.text.strip()) < self.min_page_chars]
+        await increment_counter_async("ocr_pages", "text_layer", len(pages) - len(low_text_pages))
+        if not low_text_pages:
+            return pages
+
+        logger.info(f"Sending {len(low_text_pages)} of {len(pages)} pages of {file_name} to remote OCR")
+        chunks = [
+            low_text_pages[start : start + self.pages_per_request]
+            for start in range(0, len(low_text_pages), self.pages_per_request)
+        ]
+        for texts in await asyncio.gather(*(self._process_chunk(file_name, reader, chunk) for chunk in chunks)):
+            for index, text in texts.items():
+                pages[index] = OCRPage(index=index, text=text, source="remote_ocr")
+        await increment_counter_async("ocr_pages", "remote_ocr", len(low_text_pages))
+        return pages
+
+    def _read(self, file_name: str, content: bytes) -> PdfReader | None:
+        try:
+            reader = PdfReader(BytesIO(content))
+            len(reader.pages)
+            return reader
+        except (PyPdfError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to parse {file_name}, sending the whole document to remote OCR: {e}")
+            return None
+
+    def _read_text_layer(self, reader: PdfReader) -> list[OCRPage]:
+        return [
+            OCRPage(
+                index=index, text=(page.extract_text() or "") if self.text_layer_enabled else "", source="text_layer"
+            )
+            for index, page in enumerate(reader.pages)
+        ]
+
+    async def _process_chunk(self, file_name: str, reader: PdfReader, page_indexes: list[int]) -> dict[int, str]:
+        """OCR a sub-document holding only `page_indexes` and map results back to original page indexes."""
+        content = await asyncio.to_thread(self._write_pages, reader, page_indexes)
+        texts = await self._process(file_name, content)
+        return {page_indexes[index]: text for index, text in texts.items() if index < len(page_indexes)}
+
+    def _write_pages(self, reader: PdfReader, page_indexes: list[int]) -> bytes:
+        writer = PdfWriter()
+        for index in page_indexes:
+            writer.add_page(reader.pages[index])
+        buffer = BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+
+    async def _process(self, file_name: str, content: bytes) -> dict[int, str]:
+        async with self._semaphore:
+            document_url = await self._document_url(file_name, content)
+            async with self.limiter.limit():
+                ocr_response = await self.client.ocr.process_async(
+                    model=self.model,
+                    document={
+                        "type": "document_url",
+                        "document_url": document_url,
+                    },
+                    include_image_base64=self.include_image_base64,
+                )
+        return {page.index: page.markdown for page in ocr_response.pages}
+
+    async def _document_url(self, file_name: str, content: bytes) -> str:
+        if len(content) <= self.inline_max_bytes:
+            return f"data:application/pdf;base64,{base64.b64encode(content).decode()}"
+
+        async with self.limiter.limit():
+            uploaded_pdf = await self.client.files.upload_async(
+                file={
+                    "file_name": file_name,
+                    "content": content,
+                },
+                purpose="ocr",
+            )
+        async with self.limiter.limit():
+            signed_url = await self.client.files.get_signed_url_async(file_id=uploaded_pdf.id)
+        return signed_url.url
+
+
+ocr_engine = OCREngine(
+    client=mistral_client,
+    include_image_base64=settings.ocr.OCR_INCLUDE_IMAGE_BASE64,
+    text_layer_enabled=settings.ocr.OCR_TEXT_LAYER_ENABLED,
+    min_page_chars=settings.ocr.OCR_MIN_PAGE_CHARS,
+    pages_per_request=settings.ocr.OCR_PAGES_PER_REQUEST,
+    max_concurrency=settings.ocr.OCR_MAX_CONCURRENCY,
+    inline_max_bytes=settings.ocr.OCR_INLINE_MAX_BYTES,
+)
+
+
+async def extract_pages_from_pdf_async(file_name: str, file_path: str) -> list[OCRPage]:
+    content = await anyio.Path(file_path).read_bytes()
+
+    if not settings.cache.OCR_CACHE_ENABLED:
+        return await ocr_engine.extract_async(file_name, content)
+
+    cache_key = make_cache_key(hash_bytes(content), "pages", *ocr_engine.cache_parts)
+    cached = await asyncio.to_thread(ocr_cache.get, cache_key)
+    if cached is not None:
+        logger.info(f"OCR cache hit for {file_name}")
+        return [OCRPage.model_validate(page) for page in cached]
+
+    pages = await ocr_engine.extract_async(file_name, content)
+    await asyncio.to_thread(ocr_cache.set, cache_key, [page.model_dump() for page in pages])
+    return pages
+
+
+async def extract_text_from_pdf_async(file_name: str, file_path: str) -> str:
+    pages = await extract_pages_from_pdf_async(file_name, file_path)
+    return PAGE_SEPARATOR.join(page.text for page in pages if page.text.strip())
+
+
+def extract_pages_from_pdf(file_name: str, file_path: str) -> list[OCRPage]:
+    return run_async(extract_pages_from_pdf_async(file_name, file_path))
 
 
 def extract_text_from_pdf(file_name: str, file_path: str) -> str:
-    uploaded_pdf = mistral_client.files.upload(
-        file={
-            "file_name": file_name,
-            "content": open(file_path, "rb"),
-        },
-        purpose="ocr",
-    )
-    signed_url = mistral_client.files.get_signed_url(
-        file_id=uploaded_pdf.id,
-    )
-    ocr_response = mistral_client.ocr.process(
-        model="mistral-ocr-latest",
-        document={
-            "type": "document_url",
-            "document_url": signed_url.url,
-        },
-        include_image_base64=True,
-    )
-
-    texts = ""
-    for page in ocr_response.pages:
-        markdown = page.markdown
-        texts += markdown
-
-    return texts
+    return run_async(extract_text_from_pdf_async(file_name, file_path))
@@ -0,0 +1,196 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+import tiktoken
+from loguru import logger
+from pydantic import BaseModel
+
+IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+HTML_COMMENT_PATTERN = re.compile(r"<!--.*?-->", re.DOTALL)
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$", re.MULTILINE)
+# Requires the "page" prefix, so date ranges such as "2018 / 2020" are kept.
+PAGE_NUMBER_PATTERN = re.compile(r"^\s*page\s+\d+(\s*(/|of)\s*\d+)?\s*$", re.IGNORECASE | re.MULTILINE)
+EMPHASIS_PATTERN = re.compile(r"(\*\*|__)")
+HEADING_PATTERN = re.compile(r"^\s*#{1,6}\s*(.+?)\s*#*\s*$")
+# Plain-text headings, as in text-layer output: a few words on their own line, optionally ending in a colon.
+PLAIN_HEADING_PATTERN = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{1,40}?)\s*:?\s*$")
+PLAIN_HEADING_MAX_WORDS = 4
+
+# Canonical resume sections, matched against heading text.
+SECTION_KEYWORDS = {
+    "summary": ("summary", "profile", "objective", "about"),
+    "experience": ("experience", "employment", "work history", "career"),
+    "education": ("education", "academic", "qualification"),
+    "skills": ("skill", "technolog", "competenc", "tools"),
+    "projects": ("project", "portfolio"),
+    "certifications": ("certif", "licen", "award", "achievement"),
+    "interests": ("interest", "hobb"),
+    "references": ("reference",),
+}
+HEADER_SECTION = "header"
+OTHER_SECTION = "other"
+
+
+class PreparedText(BaseModel):
+    text: str
+    raw_tokens: int
+    tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.raw_tokens - self.tokens
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model: str) -> tiktoken.Encoding | None:
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"Failed to load tokenizer for {model}, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def normalize_ocr_text(text: str) -> str:
+    """Strip OCR markdown noise: image placeholders, table rules, page numbers and repeated headers or footers."""
+    text = IMAGE_PATTERN.sub("", text)
+    text = HTML_COMMENT_PATTERN.sub("", text)
+    text = TABLE_SEPARATOR_PATTERN.sub("", text)
+    text = PAGE_NUMBER_PATTERN.sub("", text)
+    text = EMPHASIS_PATTERN.sub("", text)
+
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"[ \t]+", " ", line).strip()
+        if line.startswith("|") or line.endswith("|"):
+            cells = [cell.strip() for cell in line.strip("|").split("|")]
+            line = " | ".join(cell for cell in cells if cell)
+        lines.append(line)
+
+    # Identical lines repeated three or more times are running page headers or footers.
+    counts = Counter(
+        line
+        for line in lines
+        if 20 <= len(line) <= 80 and not line.startswith(("-", "*", "•")) and not HEADING_PATTERN.match(line)
+    )
+    seen = set()
+    kept = []
+    for line in lines:
+        if counts.get(line, 0) >= 3:
+            if line in seen:
+                continue
+            seen.add(line)
+        kept.append(line)
+
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(kept)).strip()
+
+
+def section_name(heading: str) -> str:
+    heading = heading.lower()
+    for name, keywords in SECTION_KEYWORDS.items():
+        if any(keyword in heading for keyword in keywords):
+            return name
+    return OTHER_SECTION
+
+
+def heading_section(line: str) -> str | None:
+    """Section a heading line starts, or None if the line is not a heading.
+
+    Markdown headings always count. Plain-text lines count when they are short,
+    uppercase or title case, and name a known section.
+    """
+    match = HEADING_PATTERN.match(line)
+    if match:
+        return section_name(match.group(1))
+    match = PLAIN_HEADING_PATTERN.match(line)
+    if not match:
+        return None
+    heading = match.group(1)
+    if len(heading.split()) > PLAIN_HEADING_MAX_WORDS or not (heading.isupper() or heading.istitle()):
+        return None
+    name = section_name(heading)
+    return name if name != OTHER_SECTION else None
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """Split normalized text on headings into (section name, text) pairs, in document order."""
+    sections: list[tuple[str, list[str]]] = [(HEADER_SECTION, [])]
+    for line in text.splitlines():
+        name = heading_section(line)
+        if name:
+            sections.append((name, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def header_text(text: str) -> str:
+    """Normalized text before the first known section, where resumes put the name and contact details.
+
+    The whole normalized text is returned when a known section comes first.
+    """
+    normalized = normalize_ocr_text(text)
+    leading = []
+    for name, section in split_sections(normalized):
+        if name not in (HEADER_SECTION, OTHER_SECTION):
+            break
+        leading.append(section)
+    return "\n\n".join(leading) or normalized
+
+
+def fit_to_budget(text: str, max_tokens: int, priorities: list[str], model: str) -> str:
+    """Keep whole sections in `priorities` order while they fit, then fill what is left with the
+    highest-priority section that did not fit, truncated.
+
+    Sections not named in `priorities` come last. Kept sections stay in document order.
+    """
+    sections = split_sections(text)
+    order = sorted(
+        range(len(sections)),
+        key=lambda index: priorities.index(sections[index][0]) if sections[index][0] in priorities else len(priorities),
+    )
+
+    kept: dict[int, str] = {}
+    skipped: list[int] = []
+    remaining = max_tokens
+    for index in order:
+        tokens = count_tokens(sections[index][1], model) + 1
+        if tokens <= remaining:
+            kept[index] = sections[index][1]
+            remaining -= tokens
+        else:
+            skipped.append(index)
+
+    if skipped and remaining > 50:
+        kept[skipped[0]] = truncate_tokens(sections[skipped[0]][1], remaining - 1, model)
+
+    return "\n\n".join(kept[index] for index in sorted(kept))
+
+
+def prepare_text(raw_text: str, max_tokens: int, priorities: list[str], model: str) -> PreparedText:
+    """Normalize OCR text and fit it to a token budget for one prompt."""
+    raw_tokens = count_tokens(raw_text, model)
+    text = normalize_ocr_text(raw_text)
+    tokens = count_tokens(text, model)
+    if tokens > max_tokens:
+        text = fit_to_budget(text, max_tokens, priorities, model)
+        tokens = count_tokens(text, model)
+    return PreparedText(text=text, raw_tokens=raw_tokens, tokens=tokens)
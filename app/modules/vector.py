@@ -1,81 +1,286 @@
+import atexit
 import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
 
+from loguru import logger
+from redis.exceptions import RedisError
 
-def add_resume_to_vector_db(resume_id: str, category: str, resume_text: str, **kwargs):
-    import chromadb
-    from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+from app.core.settings import settings
+from app.utils.cache import LRUTTLCache, make_cache_key
+from app.utils.rate_limiter import estimate_tokens, get_rate_limiter
+from app.utils.redis_client import redis_client
 
-    from app.core.settings import settings
+INDEX_GENERATION_KEY = "vector:resumes:generation"
 
-    embedding_function = OpenAIEmbeddingFunction(
-        api_key=settings.llm.OPENAI_API_KEY, model_name="text-embedding-3-small"
+query_embedding_cache = LRUTTLCache(
+    namespace="query_embedding",
+    max_entries=settings.cache.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.cache.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+query_result_cache = LRUTTLCache(
+    namespace="query_result",
+    max_entries=settings.cache.QUERY_RESULT_CACHE_SIZE,
+    ttl_seconds=settings.cache.QUERY_RESULT_CACHE_TTL_SECONDS,
+)
+
+
+class VectorWriterFull(Exception):
+    """The vector writer already buffers `VECTOR_MAX_BUFFERED` resumes; retry later."""
+
+
+class BufferedResume(NamedTuple):
+    resume_id: str
+    document: str
+    metadata: dict
+    embedding: list[float] | None
+    written: Future
+
+
+class ResumeVectorWriter:
+    """Buffers resumes and writes them to Chroma in batches.
+
+    A batch is flushed as soon as it holds `VECTOR_BATCH_SIZE` resumes, and a
+    background thread flushes whatever is buffered every
+    `VECTOR_FLUSH_INTERVAL_SECONDS`, which bounds how long a resume waits to
+    become searchable. Each flush makes one embedding request for the resumes
+    that do not bring their own embedding, and one write. If a batch fails, its
+    resumes are written one at a time, so a bad document only fails itself.
+
+    `add` returns a future that resolves once the resume is written, or fails
+    with the write error; failed resumes are dropped from the buffer and left
+    to the caller to retry.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_buffered: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._buffer: list[BufferedResume] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+
+    def add(self, resume_id: str, document: str, metadata: dict, embedding: list[float] | None = None) -> Future:
+        self._ensure_flusher()
+        written: Future = Future()
+        with self._buffer_lock:
+            if len(self._buffer) >= self.max_buffered:
+                raise VectorWriterFull(f"{len(self._buffer)} resumes are waiting to be written to vector db")
+            self._buffer.append(BufferedResume(resume_id, document, metadata, embedding, written))
+            is_full = len(self._buffer) >= self.batch_size
+        if is_full:
+            self.flush()
+        return written
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._buffer_lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+
+            try:
+                self._write(batch)
+                return
+            except Exception as e:
+                if len(batch) > 1:
+                    logger.warning(f"Failed to write {len(batch)} resumes to vector db, writing one at a time: {e}")
+                else:
+                    batch[0].written.set_exception(e)
+                    logger.error(f"Failed to write resume {batch[0].resume_id} to vector db: {e}")
+                    return
+
+            for item in batch:
+                try:
+                    self._write([item])
+                except Exception as e:
+                    item.written.set_exception(e)
+                    logger.error(f"Failed to write resume {item.resume_id} to vector db: {e}")
+
+    def _write(self, batch: list[BufferedResume]) -> None:
+        from app.utils.vector_clients import chroma_client, embedding_function
+
+        documents = [item.document for item in batch]
+        embeddings = [item.embedding for item in batch]
+        missing = [index for index, embedding in enumerate(embeddings) if embedding is None]
+
+        collection = chroma_client.get_or_create_collection(
+            name=settings.vector.CHROMA_COLLECTION,
+            embedding_function=embedding_function,  # type: ignore
+        )
+        if missing:
+            missing_documents = [documents[index] for index in missing]
+            limiter = get_rate_limiter("openai", settings.vector.EMBEDDING_MODEL)
+            with limiter.limit_sync(estimate_tokens(*missing_documents, output_tokens=0)):
+                for index, embedding in zip(missing, embedding_function(missing_documents)):
+                    embeddings[index] = embedding
+        collection.upsert(
+            ids=[item.resume_id for item in batch],
+            embeddings=embeddings,  # type: ignore
+            documents=documents,
+            metadatas=[item.metadata for item in batch],
+        )
+        logger.info(f"Wrote {len(batch)} resumes to vector db")
+        bump_index_generation()
+        for item in batch:
+            item.written.set_result(None)
+
+    def reset(self) -> None:
+        """Drop state inherited from a parent process."""
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._buffer_lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._run, name="vector-writer", daemon=True)
+                self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush resumes to vector db: {e}")
+
+
+resume_vector_writer = ResumeVectorWriter(
+    batch_size=settings.vector.VECTOR_BATCH_SIZE,
+    flush_interval=settings.vector.VECTOR_FLUSH_INTERVAL_SECONDS,
+    max_buffered=settings.vector.VECTOR_MAX_BUFFERED,
+)
+os.register_at_fork(after_in_child=resume_vector_writer.reset)
+atexit.register(resume_vector_writer.flush)
+
+
+def add_resume_to_vector_db(
+    resume_id: str, category: str, resume_text: str, embedding: list[float] | None = None, **kwargs
+) -> Future:
+    """Buffer a resume for the vector db; the returned future resolves once it is written."""
+    return resume_vector_writer.add(
+        resume_id=resume_id,
+        document=resume_text,
+        metadata={"resume_id": resume_id, "category": category, **kwargs},
+        embedding=embedding,
     )
-    chroma_client = chromadb.PersistentClient(path="./chroma_db")
+
+
+def get_resume_embedding(resume_id: str) -> list[float] | None:
+    """Stored embedding of an indexed resume, or None if it is not in the vector db."""
+    from app.utils.vector_clients import chroma_client, embedding_function
 
     collection = chroma_client.get_or_create_collection(
-        name="resumes", embedding_function=embedding_function #type: ignore
-    )
-    collection.add(
-        documents=[resume_text],
-        metadatas=[{"resume_id": resume_id, "category": category, **kwargs}],
-        ids=[resume_id],
+        name=settings.vector.CHROMA_COLLECTION,
+        embedding_function=embedding_function,  # type: ignore
     )
+    embeddings = collection.get(ids=[resume_id], include=["embeddings"])["embeddings"]  # type: ignore
+    if embeddings is None or len(embeddings) == 0:
+        return None
+    return [float(value) for value in embeddings[0]]
+
+
+def bump_index_generation() -> None:
+    """Invalidate cached search results in every process after an ingest."""
+    try:
+        redis_client.incr(INDEX_GENERATION_KEY)
+    except RedisError as e:
+        logger.warning(f"Failed to bump vector index generation: {e}")
+
+
+def current_index_generation() -> int | None:
+    try:
+        generation = redis_client.get(INDEX_GENERATION_KEY)
+    except RedisError as e:
+        logger.warning(f"Failed to read vector index generation: {e}")
+        return None
+    return int(generation) if generation is not None else 0  # type: ignore
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def embed_query(query: str):
+    normalized_query = normalize_query(query)
+    cache_key = make_cache_key(settings.vector.EMBEDDING_MODEL, normalized_query)
+    embedding = query_embedding_cache.get(cache_key)
+    if embedding is None:
+        from app.utils.vector_clients import embedding_function
+
+        limiter = get_rate_limiter("openai", settings.vector.EMBEDDING_MODEL)
+        with limiter.limit_sync(estimate_tokens(normalized_query, output_tokens=0)):
+            embedding = embedding_function([normalized_query])[0]
+        query_embedding_cache.set(cache_key, embedding)
+    return embedding
 
 
 def query_resume_from_vector_db(
-    query: str, n_results: int = 5, filter: dict | None = None
+    query: str,
+    n_results: int = 5,
+    filter: dict | None = None,
+    include: tuple[str, ...] = ("documents", "distances", "metadatas"),
 ):
+    """Nearest resumes to the query, with only the Chroma fields named in `include`."""
     from app.utils.vector_clients import chroma_client, embedding_function
 
+    # Results are cached per index generation, so any ingest makes older entries unreachable.
+    result_cache_key = None
+    if settings.cache.QUERY_RESULT_CACHE_TTL_SECONDS > 0:
+        generation = current_index_generation()
+        if generation is not None:
+            result_cache_key = make_cache_key(normalize_query(query), n_results, filter, sorted(include), generation)
+            cached = query_result_cache.get(result_cache_key)
+            if cached is not None:
+                return cached
+
     collection = chroma_client.get_collection(
-        name="resumes", embedding_function=embedding_function #type: ignore
+        name=settings.vector.CHROMA_COLLECTION,
+        embedding_function=embedding_function,  # type: ignore
     )
     results = collection.query(
-        query_texts=[query],
+        query_embeddings=[embed_query(query)],
         n_results=n_results,
         where=filter,
+        include=list(include),  # type: ignore
     )
-    return extract_resume_data(results)
+    resumes = extract_resume_data(results)
+
+    if result_cache_key is not None:
+        query_result_cache.set(result_cache_key, resumes)
+    return resumes
+
+
+# Chroma result fields and the key each one gets in a hit.
+RESULT_FIELDS = {"distances": "distance", "metadatas": "metadata", "documents": "content"}
 
 
-def extract_resume_data(data):
+def extract_resume_data(data) -> list[dict]:
+    """Flatten Chroma query results into one dict per hit, holding only the fields that were included."""
     if isinstance(data, str):
         try:
             data = json.loads(data)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON string: {e}")
 
-    required_fields = ["documents", "distances", "metadatas"]
-    for field in required_fields:
-        if field not in data:
-            raise ValueError(f"Missing required field: {field}")
-
-    documents = data.get("documents", [])
-    distances = data.get("distances", [])
-    metadatas = data.get("metadatas", [])
-
-    if not (len(documents) == len(distances) == len(metadatas)):
-        raise ValueError(
-            "documents, distances, and metadatas must have the same number of elements"
-        )
-
-    result = []
-
-    for i in range(len(documents)):
-        document_group = documents[i] if i < len(documents) else []
-        distance_group = distances[i] if i < len(distances) else []
-        metadata_group = metadatas[i] if i < len(metadatas) else []
-
-        if not (len(document_group) == len(distance_group) == len(metadata_group)):
-            raise ValueError(f"Mismatch in lengths for group {i}")
+    if data.get("ids") is None:
+        raise ValueError("Missing required field: ids")
 
-        for j in range(len(document_group)):
-            result.append(
-                {
-                    "content": document_group[j],
-                    "distance": float(distance_group[j]),
-                    "metadata": metadata_group[j],
-                }
-            )
+    fields = [field for field in RESULT_FIELDS if data.get(field) is not None]
+    keys = ["resume_id", *(RESULT_FIELDS[field] for field in fields)]
+    columns = [data["ids"], *(data[field] for field in fields)]
+    if "distances" in fields:
+        columns[keys.index("distance")] = [[float(distance) for distance in group] for group in data["distances"]]
 
-    return result
+    try:
+        return [dict(zip(keys, hit)) for groups in zip(*columns, strict=True) for hit in zip(*groups, strict=True)]
+    except ValueError:
+        raise ValueError("Query result fields must have the same number of elements")
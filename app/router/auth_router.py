@@ -5,10 +5,11 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from loguru import logger
-from sqlmodel import Session, or_, select
+from sqlmodel import or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.settings import settings
-from app.database.engine import db_session
+from app.database.engine import async_db_session
 from app.database.models import User
 from app.schema.auth import AuthRegister, RegisterResponse, Token, UserResponse
 from app.services import auth_service
@@ -21,7 +22,9 @@ auth_router = APIRouter(
 )
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], session: Session = Depends(db_session)):
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)], session: AsyncSession = Depends(async_db_session)
+):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -34,18 +37,18 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], sessio
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = session.exec(select(User).where(User.email == email)).first()
+    user = (await session.exec(select(User).where(User.email == email))).first()
     if user is None:
         raise credentials_exception
     return user
 
 
 @auth_router.post("/register", response_model=RegisterResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(request: Request, user_data: AuthRegister, session: Session = Depends(db_session)):
-    user_is_registered = session.exec(select(User).where(User.email == user_data.email)).first()
+async def register_user(request: Request, user_data: AuthRegister, session: AsyncSession = Depends(async_db_session)):
+    user_is_registered = (await session.exec(select(User).where(User.email == user_data.email))).first()
     if user_is_registered:
         raise HTTPException(status_code=400, detail="Email already registered")
-    existing_username = session.exec(select(User).where(User.username == user_data.username)).first()
+    existing_username = (await session.exec(select(User).where(User.username == user_data.username))).first()
     if existing_username:
         raise HTTPException(status_code=400, detail="Username already taken")
     if len(user_data.password) < 6:
@@ -53,18 +56,22 @@ async def register_user(request: Request, user_data: AuthRegister, session: Sess
     hashed_password = auth_service.hash_password(user_data.password)
     user = User(email=user_data.email, password_hash=hashed_password, username=user_data.username)
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     logger.info(f"New user registered {user.username}")
     return user
 
 
 @auth_router.post("/login", response_model=Token)
 async def login(
-    request: Request, form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(db_session)
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    session: AsyncSession = Depends(async_db_session),
 ):
-    user = session.exec(
-        select(User).where(or_(User.email == form_data.username, User.username == form_data.username))
+    user = (
+        await session.exec(
+            select(User).where(or_(User.email == form_data.username, User.username == form_data.username))
+        )
     ).first()
 
     if not user or not auth_service.verify_password(form_data.password, user.password_hash):
@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+
+from app.database.engine import async_engine, engine
+from app.database.pool_metrics import pool_stats
+from app.modules.ocr import ocr_cache
+from app.modules.vector import query_embedding_cache, query_result_cache
+from app.services.resume.resume_match import resume_matrix
+from app.services.resume.resume_methods import analyze_cache, extract_cache, summary_cache
+from app.utils.metrics import read_counters
+
+metrics_router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+)
+
+
+@metrics_router.get("/")
+async def read_metrics():
+    return {
+        "database_pools": {
+            "sync": pool_stats(engine.pool),
+            "async": pool_stats(async_engine.sync_engine.pool),
+        },
+        "ocr_cache": ocr_cache.stats(),
+        "ocr_pages": read_counters("ocr_pages"),
+        "llm_cache": {
+            "summarize_resume": summary_cache.stats(),
+            "extract_resume": extract_cache.stats(),
+            "analyze_resume": analyze_cache.stats(),
+        },
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "query_result_cache": query_result_cache.stats(),
+        "llm_stage_ms": read_counters("llm_stage_ms"),
+        "llm_input_tokens": read_counters("llm_input_tokens"),
+        "llm_usage": read_counters("llm_usage"),
+        "llm_tiers": read_counters("llm_tiers"),
+        "rate_limits": read_counters("rate_limits"),
+        "dedup": read_counters("dedup"),
+        "resume_match": read_counters("resume_match"),
+        "resume_matrix": resume_matrix.stats(),
+    }
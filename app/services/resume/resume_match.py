@@ -0,0 +1,329 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.settings import settings
+from app.database.engine import engine
+from app.database.models import Resume, ResumeStatus
+from app.modules.vector import current_index_generation, embed_query
+from app.services.resume.resume_schema import MatchResumeRequest
+from app.services.resume.resume_service import RESUME_LIST_COLUMNS
+from app.utils.metrics import increment_counters_async
+from app.utils.skills import canonicalize_skill, canonicalize_skills
+
+SKILL_TOKEN_PATTERN = re.compile(r"[\w+#./-]+")
+MAX_SKILL_WORDS = 3
+# Filters that keep at most this share of resumes score only those rows; gathering
+# rows costs about as much as scoring them, so wider filters scan the whole matrix.
+GATHER_MAX_FRACTION = 0.15
+
+
+class ResumeMatrixSnapshot:
+    """Normalized embeddings of the indexed resumes, one row per resume, with category and skill postings."""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        embeddings: np.ndarray,
+        categories: np.ndarray,
+        skill_postings: dict[str, np.ndarray],
+        generation: int | None,
+    ):
+        self.ids = ids
+        self.embeddings = embeddings
+        self.categories = categories
+        self.skill_postings = skill_postings
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class ResumeMatrix:
+    """Matrix of every indexed resume embedding, for scoring all candidates at once.
+
+    The matrix is built from Chroma and Postgres into a `.npy` file under
+    `CACHE_DIR`, and each process maps that file read-only, so API workers share
+    one copy through the page cache. A file lock lets one process build a
+    generation while the others wait and then map it.
+
+    Loads run on a background thread: `warm` starts the first one at startup and
+    `get` returns None until it finishes. Once the vector index generation
+    changes, the matrix is reloaded at most every `MATCH_INDEX_REFRESH_SECONDS`,
+    and requests keep using the previous snapshot until the new one is ready.
+    """
+
+    def __init__(self, refresh_seconds: float, load_batch_size: int):
+        self.refresh_seconds = refresh_seconds
+        self.load_batch_size = load_batch_size
+        self.directory = Path(settings.cache.CACHE_DIR) / "resume_matrix"
+        self._snapshot: ResumeMatrixSnapshot | None = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def warm(self) -> None:
+        """Start loading the matrix in the background."""
+        with self._lock:
+            start = not self._refreshing
+            self._refreshing = True
+        if start:
+            threading.Thread(target=self._refresh, name="resume-matrix", daemon=True).start()
+
+    def get(self) -> ResumeMatrixSnapshot | None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.warm()
+        elif time.monotonic() - snapshot.loaded_at >= self.refresh_seconds:
+            # An unreadable generation (None) reloads every interval.
+            generation = current_index_generation()
+            if generation is None or generation != snapshot.generation:
+                self.warm()
+        return snapshot
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False, "loading": self._refreshing}
+        return {
+            "loaded": True,
+            "resumes": len(snapshot),
+            "generation": snapshot.generation,
+            "age_seconds": round(time.monotonic() - snapshot.loaded_at, 1),
+            "bytes": snapshot.embeddings.nbytes,
+        }
+
+    def reset(self) -> None:
+        """Drop state inherited from a parent process."""
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _refresh(self) -> None:
+        try:
+            self._snapshot = self._load()
+        except Exception as e:
+            logger.error(f"Failed to load resume matrix, keeping the previous one: {e}")
+        finally:
+            self._refreshing = False
+
+    def _load(self) -> ResumeMatrixSnapshot:
+        # Read the generation first, so an ingest during the load triggers another refresh.
+        generation = current_index_generation()
+        # Without a generation the file cannot be matched to the index, so it is always rebuilt.
+        name = str(generation) if generation is not None else "latest"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if generation is None or not (self.directory / f"{name}.npy").exists():
+                self._build(name)
+            return self._open(name, generation)
+
+    def _build(self, name: str) -> None:
+        """Write the matrix for the current index to `<name>.npy`, with its ids, categories and skills in `<name>.json`.
+
+        Embeddings are written batch by batch into a preallocated file, so the
+        build never holds more than one batch in memory. Chroma has no stable
+        order across pages, so ids seen twice are skipped.
+        """
+        started = time.perf_counter()
+        with Session(engine) as session:
+            statement = select(Resume.id, Resume.category, Resume.skill_keys).where(
+                Resume.status == ResumeStatus.COMPLETED
+            )
+            details = {resume_id: (category, skill_keys) for resume_id, category, skill_keys in session.exec(statement)}
+
+        from app.utils.vector_clients import chroma_client, embedding_function
+
+        collection = chroma_client.get_or_create_collection(
+            name=settings.vector.CHROMA_COLLECTION,
+            embedding_function=embedding_function,  # type: ignore
+        )
+        capacity = min(collection.count(), len(details))
+        partial_path = self.directory / f"{name}.part.npy"
+        embeddings = None
+        ids: list[str] = []
+        seen: set[str] = set()
+        offset = 0
+        while len(ids) < capacity:
+            batch = collection.get(include=["embeddings"], limit=self.load_batch_size, offset=offset)  # type: ignore
+            if not batch["ids"]:
+                break
+            offset += len(batch["ids"])
+
+            rows = []
+            for row, resume_id in enumerate(batch["ids"]):
+                if resume_id in details and resume_id not in seen and len(ids) + len(rows) < capacity:
+                    seen.add(resume_id)
+                    rows.append(row)
+            if not rows:
+                continue
+            vectors = np.asarray(batch["embeddings"], dtype=np.float32)[rows]
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            if embeddings is None:
+                embeddings = np.lib.format.open_memmap(
+                    partial_path, mode="w+", dtype=np.float32, shape=(capacity, vectors.shape[1])
+                )
+            embeddings[len(ids) : len(ids) + len(rows)] = vectors
+            ids.extend(batch["ids"][row] for row in rows)
+
+        if embeddings is None:
+            np.save(partial_path, np.zeros((0, 0), dtype=np.float32))
+        else:
+            embeddings.flush()
+            del embeddings
+
+        metadata = {
+            "ids": ids,
+            "categories": [details[resume_id][0] or "" for resume_id in ids],
+            "skills": [details[resume_id][1] or [] for resume_id in ids],
+        }
+        partial_metadata_path = self.directory / f"{name}.part.json"
+        partial_metadata_path.write_text(json.dumps(metadata))
+        os.replace(partial_metadata_path, self.directory / f"{name}.json")
+        os.replace(partial_path, self.directory / f"{name}.npy")
+
+        # Processes still using an older file keep their mapping after it is unlinked.
+        for path in self.directory.glob("*.*"):
+            if path.stem != name and path.suffix in (".npy", ".json"):
+                path.unlink(missing_ok=True)
+        logger.info(f"Built matrix of {len(ids)} resume embeddings in {time.perf_counter() - started:.2f}s")
+
+    def _open(self, name: str, generation: int | None) -> ResumeMatrixSnapshot:
+        metadata = json.loads((self.directory / f"{name}.json").read_text())
+        ids = metadata["ids"]
+        postings: dict[str, list[int]] = defaultdict(list)
+        for row, skill_keys in enumerate(metadata["skills"]):
+            for skill in skill_keys:
+                postings[skill].append(row)
+
+        snapshot = ResumeMatrixSnapshot(
+            ids=np.array(ids, dtype=object),
+            # Rows past the last id were preallocated for resumes that were filtered out or skipped.
+            embeddings=np.load(self.directory / f"{name}.npy", mmap_mode="r")[: len(ids)],
+            categories=np.array(metadata["categories"], dtype=object),
+            skill_postings={skill: np.array(rows, dtype=np.int64) for skill, rows in postings.items()},
+            generation=generation,
+        )
+        logger.info(f"Mapped {len(snapshot)} resume embeddings for matching")
+        return snapshot
+
+
+resume_matrix = ResumeMatrix(
+    refresh_seconds=settings.vector.MATCH_INDEX_REFRESH_SECONDS,
+    load_batch_size=settings.vector.MATCH_INDEX_LOAD_BATCH_SIZE,
+)
+os.register_at_fork(after_in_child=resume_matrix.reset)
+
+
+def extract_skills(text: str, vocabulary: dict) -> list[str]:
+    """Known skill keys mentioned in free text, matched on phrases of up to `MAX_SKILL_WORDS` words."""
+    words = [word.strip(".,-/") for word in SKILL_TOKEN_PATTERN.findall(text.lower())]
+    words = [word for word in words if word]
+    found: dict[str, None] = {}
+    for size in range(MAX_SKILL_WORDS, 0, -1):
+        for index in range(len(words) - size + 1):
+            key = canonicalize_skill(" ".join(words[index : index + size]))
+            if key in vocabulary:
+                found[key] = None
+    return list(found)
+
+
+def score_candidates(
+    snapshot: ResumeMatrixSnapshot,
+    query_embedding,
+    skills: list[str],
+    body: MatchResumeRequest,
+) -> tuple[list[tuple[str, float, float, float]], int]:
+    """Score every eligible resume and return one ranked page of (id, score, similarity, skill overlap),
+    with the number of resumes scored."""
+    mask = np.ones(len(snapshot), dtype=bool)
+    if body.category:
+        mask &= snapshot.categories == body.category
+    for skill in canonicalize_skills(body.skills_all):
+        required = np.zeros(len(snapshot), dtype=bool)
+        required[snapshot.skill_postings.get(skill, [])] = True
+        mask &= required
+    candidates = np.flatnonzero(mask)
+    if not len(candidates):
+        return [], 0
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query /= max(float(np.linalg.norm(query)), 1e-12)
+    if len(candidates) <= GATHER_MAX_FRACTION * len(snapshot):
+        similarity = snapshot.embeddings[candidates] @ query
+    else:
+        similarity = (snapshot.embeddings @ query)[candidates]
+
+    overlap = np.zeros(len(snapshot), dtype=np.float32)
+    for skill in skills:
+        overlap[snapshot.skill_postings.get(skill, [])] += 1
+    overlap = overlap[candidates] / max(len(skills), 1)
+
+    skill_weight = settings.vector.MATCH_SKILL_WEIGHT if skills else 0.0
+    scores = (1 - skill_weight) * similarity + skill_weight * overlap
+
+    # Only the rows up to the end of the page are sorted.
+    end = min(body.offset + body.limit, len(candidates))
+    if body.offset >= end:
+        return [], len(candidates)
+    top = np.argpartition(-scores, end - 1)[:end]
+    page = top[np.argsort(-scores[top], kind="stable")][body.offset :]
+    ranked = [
+        (str(snapshot.ids[candidates[row]]), float(scores[row]), float(similarity[row]), float(overlap[row]))
+        for row in page
+    ]
+    return ranked, len(candidates)
+
+
+async def match_resumes(db: AsyncSession, body: MatchResumeRequest) -> tuple[list[dict], int, list[str]]:
+    """Rank indexed resumes against a job description by embedding similarity and skill overlap.
+
+    Returns one page of hits, the number of candidates scored and the skills used for overlap.
+    """
+    started = time.perf_counter()
+    snapshot = await run_in_threadpool(resume_matrix.get)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Resume embeddings are still loading. Please retry shortly.",
+        )
+    skills = canonicalize_skills(body.skills) or extract_skills(body.job_description, snapshot.skill_postings)
+    if not len(snapshot):
+        return [], 0, skills
+
+    query_embedding = await run_in_threadpool(embed_query, body.job_description)
+    ranked, total = await run_in_threadpool(score_candidates, snapshot, query_embedding, skills, body)
+    await increment_counters_async("resume_match", {"count": 1, "ms": int((time.perf_counter() - started) * 1000)})
+    if not ranked:
+        return [], total, skills
+
+    statement = select(*RESUME_LIST_COLUMNS).where(col(Resume.id).in_([resume_id for resume_id, *_ in ranked]))
+    rows = {row.id: dict(row._mapping) for row in (await db.exec(statement)).all()}  # type: ignore
+    hits = []
+    for resume_id, score, similarity, overlap in ranked:
+        if resume_id not in rows:
+            continue
+        resume_skills = set(canonicalize_skills(rows[resume_id]["skills"] or []))
+        hits.append(
+            {
+                **rows[resume_id],
+                "score": score,
+                "similarity": similarity,
+                "skill_overlap": overlap,
+                "matched_skills": [skill for skill in skills if skill in resume_skills],
+            }
+        )
+    return hits, total, skills
@@ -1,7 +1,60 @@
-from fastapi import File, HTTPException, UploadFile
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import time
+import zipfile
+import zlib
+from datetime import datetime
 
-from app.services.resume.resume_schema import CategorySchema
-from app.utils.llm_clients import openai_client
+import anyio
+from fastapi import File, HTTPException, UploadFile, status
+from loguru import logger
+from openai import ContentFilterFinishReasonError, LengthFinishReasonError
+from pydantic import ValidationError
+
+from app.core.settings import settings
+from app.modules.text_prep import PreparedText, count_tokens, header_text, prepare_text
+from app.services.resume.resume_schema import CategorySchema, ContactSchema, ResumeAnalysisSchema
+from app.utils.cache import TieredCache, hash_bytes, make_cache_key
+from app.utils.event_loop import LoopSemaphore, run_async
+from app.utils.generate_ids import generate_id
+from app.utils.llm_clients import async_openai_client
+from app.utils.metrics import increment_counters_async
+from app.utils.rate_limiter import estimate_tokens, get_rate_limiter
+
+llm_semaphore = LoopSemaphore(settings.llm.LLM_STAGE_CONCURRENCY)
+
+RESUME_CATEGORIES = {
+    "software_engineer",
+    "data_scientist",
+    "product_manager",
+    "marketing_manager",
+    "sales_manager",
+    "other",
+}
+
+# Resume sections each prompt needs most, kept first when the text exceeds its token budget.
+SUMMARY_SECTIONS = ["header", "summary", "experience", "education", "skills", "projects", "certifications"]
+EXTRACT_SECTIONS = ["header", "skills", "summary", "experience", "certifications", "education", "projects"]
+
+summary_cache = TieredCache(
+    namespace="llm_summarize_resume",
+    max_bytes=settings.cache.LLM_CACHE_MAX_BYTES,
+    ttl_seconds=settings.cache.LLM_CACHE_TTL_SECONDS,
+)
+extract_cache = TieredCache(
+    namespace="llm_extract_resume",
+    max_bytes=settings.cache.LLM_CACHE_MAX_BYTES,
+    ttl_seconds=settings.cache.LLM_CACHE_TTL_SECONDS,
+)
+analyze_cache = TieredCache(
+    namespace="llm_analyze_resume",
+    max_bytes=settings.cache.LLM_CACHE_MAX_BYTES,
+    ttl_seconds=settings.cache.LLM_CACHE_TTL_SECONDS,
+)
 
 
 def validate_pdf_file(file: UploadFile = File(...)) -> UploadFile:
@@ -20,8 +73,139 @@ def validate_pdf_file(file: UploadFile = File(...)) -> UploadFile:
     return file
 
 
-def summarize_resume(raw_text: str) -> str:
-    SYSTEM_PROMPT = """
+def encode_cursor(created_at: datetime, resume_id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), resume_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, resume_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), resume_id
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def is_pdf_upload(file: UploadFile) -> bool:
+    return file.content_type == "application/pdf" or (file.filename or "").lower().endswith(".pdf")
+
+
+def is_zip_upload(file: UploadFile) -> bool:
+    return file.content_type in ("application/zip", "application/x-zip-compressed") or (
+        file.filename or ""
+    ).lower().endswith(".zip")
+
+
+async def save_upload_file(file: UploadFile, destination: str, max_bytes: int | None = None) -> str:
+    """Stream an upload to disk in fixed-size chunks and return its SHA-256.
+
+    Memory use is bounded by `UPLOAD_CHUNK_SIZE` regardless of file size. The
+    upload is rejected once it grows past `max_bytes` (`UPLOAD_MAX_BYTES` by
+    default), and nothing is left at `destination` unless the whole file was
+    written. Request bodies are already capped while they stream in by
+    `UploadSizeLimitMiddleware`; this check applies the per-file limit.
+    """
+    max_bytes = max_bytes or settings.app_settings.UPLOAD_MAX_BYTES
+    chunk_size = settings.app_settings.UPLOAD_CHUNK_SIZE
+    partial_path = anyio.Path(f"{destination}.part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with await anyio.open_file(partial_path, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File is too large. Maximum size is {max_bytes} bytes.",
+                    )
+                digest.update(chunk)
+                await f.write(chunk)
+        await partial_path.rename(destination)
+    except BaseException:
+        await partial_path.unlink(missing_ok=True)
+        raise
+
+    return digest.hexdigest()
+
+
+def extract_pdfs_from_zip(
+    archive_path: str, upload_dir: str, max_files: int, archive_name: str = ""
+) -> tuple[list[dict], list[str]]:
+    """Copy the PDF members of a zip archive into `upload_dir`, one chunk at a time.
+
+    Returns the stored files (same fields as a single upload) and the names of
+    skipped members. An archive that is not a valid zip, or that is corrupt
+    partway through, is skipped whole under `archive_name` and the files
+    already copied from it are deleted. Blocking; run it in a worker thread.
+    """
+    max_bytes = settings.app_settings.UPLOAD_MAX_BYTES
+    chunk_size = settings.app_settings.UPLOAD_CHUNK_SIZE
+    stored, skipped = [], []
+    file_path = None
+
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                if member.is_dir():
+                    continue
+                name = os.path.basename(member.filename)
+                # The declared size is checked before reading; the copy loop enforces it against the real bytes.
+                if not name.lower().endswith(".pdf") or member.file_size > max_bytes or len(stored) >= max_files:
+                    skipped.append(member.filename)
+                    continue
+
+                resume_id = generate_id()
+                file_path = f"{upload_dir}/{resume_id}.pdf"
+                digest = hashlib.sha256()
+                size = 0
+                with archive.open(member) as source, open(file_path, "wb") as target:
+                    while chunk := source.read(chunk_size):
+                        size += len(chunk)
+                        if size > max_bytes:
+                            break
+                        digest.update(chunk)
+                        target.write(chunk)
+                if size > max_bytes:
+                    os.remove(file_path)
+                    skipped.append(member.filename)
+                    continue
+
+                stored.append(
+                    {
+                        "resume_id": resume_id,
+                        "file_name": f"{resume_id}.pdf",
+                        "file_path": file_path,
+                        "content_hash": digest.hexdigest(),
+                    }
+                )
+    except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+        logger.warning(f"Skipping corrupt zip archive {archive_name}: {e}")
+        for path in {file_path, *(file["file_path"] for file in stored)} - {None}:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+        return [], [archive_name]
+
+    return stored, skipped
+
+
+def llm_cache_key(model: str, system_prompt: str, raw_text: str, response_schema: dict | None = None) -> str:
+    """Key LLM responses by model, prompt, input text and response schema.
+
+    Editing a prompt or schema changes the key, and bumping `LLM_CACHE_VERSION`
+    invalidates every entry.
+    """
+    return make_cache_key(
+        settings.cache.LLM_CACHE_VERSION,
+        model,
+        hash_bytes(system_prompt.encode()),
+        hash_bytes(raw_text.encode()),
+        response_schema,
+    )
+
+
+SUMMARY_SYSTEM_PROMPT = """
         You are a resume summarizer.
         Your task is to summarize the resume text provided.
         The summary should be concise and focus on the key information.
@@ -47,19 +231,7 @@ def summarize_resume(raw_text: str) -> str:
             - References
         """
 
-    response = openai_client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": f"Resume text: {raw_text}"},
-        ],
-    )
-    summary = response.choices[0].message.content
-    return summary #type: ignore
-
-
-def extract_resume(raw_text: str):
-    SYSTEM_PROMPT = """
+EXTRACT_SYSTEM_PROMPT = """
         You are a resume classifier.
         Your task is to classify the resume text provided.
         The classification should be one of the following categories:
@@ -69,14 +241,387 @@ def extract_resume(raw_text: str):
         - marketing_manager
         - sales_manager
         - other
+        Set confidence to how sure you are of the category and contact fields, lower when they are unclear or missing.
+    """
+
+CONTACT_SYSTEM_PROMPT = """
+        You are a resume parser.
+        Your task is to extract the full name, email, phone number and address of the person
+        from the top of the resume text provided.
+        Leave a field empty when it is missing.
+    """
+
+ANALYZE_SYSTEM_PROMPT = """
+        You are a resume analyst.
+        Your task is to summarize and classify the resume text provided in one response.
+
+        # SUMMARY
+        - The summary should be in bullet points, one "- " line each.
+        - Each bullet point should direct and concise.
+        - The summary should cover the following sections:
+            - Personal Information
+            - Education
+            - Work Experience
+            - Skills
+            - Projects
+            - Certifications
+            - Interests
+            - References
+
+        # CATEGORY
+        The classification should be one of the following categories:
+        - software_engineer
+        - data_scientist
+        - product_manager
+        - marketing_manager
+        - sales_manager
+        - other
+        Set confidence to how sure you are of the category and contact fields, lower when they are unclear or missing.
     """
-    response = openai_client.chat.completions.parse(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": f"Resume text: {raw_text}"},
-        ],
-        response_format=CategorySchema,
+
+
+async def record_usage(name: str, usage) -> None:
+    """Count the tokens a completion was billed for, to compare analysis modes on the same corpus."""
+    if usage is None:
+        return
+    await increment_counters_async(
+        "llm_usage",
+        {
+            f"{name}:calls": 1,
+            f"{name}:prompt_tokens": usage.prompt_tokens,
+            f"{name}:completion_tokens": usage.completion_tokens,
+        },
     )
-    category = response.choices[0].message.parsed
-    return category.model_dump() #type: ignore
+
+
+async def record_tier(model: str, seconds: float) -> None:
+    """Count calls and latency per model tier."""
+    await increment_counters_async("llm_tiers", {f"{model}:calls": 1, f"{model}:ms": int(seconds * 1000)})
+
+
+async def summarize_resume_async(raw_text: str) -> str:
+    model = settings.llm.LLM_SUMMARY_MODEL
+    cache_key = llm_cache_key(model, SUMMARY_SYSTEM_PROMPT, raw_text)
+    if settings.cache.LLM_CACHE_ENABLED:
+        cached = await asyncio.to_thread(summary_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+    limiter = get_rate_limiter("openai", model)
+    started = time.perf_counter()
+    async with llm_semaphore, limiter.limit(estimate_tokens(SUMMARY_SYSTEM_PROMPT, raw_text)) as lease:
+        response = await async_openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Resume text: {raw_text}"},
+            ],
+        )
+        lease.used_tokens = response.usage.total_tokens if response.usage else None
+    await record_tier(model, time.perf_counter() - started)
+    await record_usage("summarize_resume", response.usage)
+    summary = response.choices[0].message.content
+    if settings.cache.LLM_CACHE_ENABLED and summary:
+        await asyncio.to_thread(summary_cache.set, cache_key, summary)
+    return summary  # type: ignore
+
+
+def extraction_problem(category: CategorySchema | None) -> str | None:
+    """Reason to escalate an extraction to the larger model, or None when it can be kept."""
+    if category is None:
+        return "refused"
+    if category.category not in RESUME_CATEGORIES:
+        return "invalid_category"
+    if not category.full_name.strip():
+        return "missing_name"
+    if category.confidence < settings.llm.LLM_EXTRACT_MIN_CONFIDENCE:
+        return "low_confidence"
+    return None
+
+
+async def _extract_with_model(model: str, raw_text: str, usage_name: str) -> CategorySchema | None:
+    limiter = get_rate_limiter("openai", model)
+    started = time.perf_counter()
+    async with llm_semaphore, limiter.limit(estimate_tokens(EXTRACT_SYSTEM_PROMPT, raw_text)) as lease:
+        response = await async_openai_client.chat.completions.parse(
+            model=model,
+            messages=[
+                {"role": "system", "content": EXTRACT_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Resume text: {raw_text}"},
+            ],
+            response_format=CategorySchema,
+        )
+        lease.used_tokens = response.usage.total_tokens if response.usage else None
+    await record_tier(model, time.perf_counter() - started)
+    await record_usage(usage_name, response.usage)
+    return response.choices[0].message.parsed
+
+
+async def extract_resume_async(raw_text: str) -> dict:
+    """Extract key information with `LLM_EXTRACT_MODEL`, escalating to `LLM_EXTRACT_ESCALATION_MODEL`
+    when the output fails validation or its confidence is below `LLM_EXTRACT_MIN_CONFIDENCE`."""
+    model = settings.llm.LLM_EXTRACT_MODEL
+    escalation_model = settings.llm.LLM_EXTRACT_ESCALATION_MODEL
+    # The escalation rule decides which model's output is kept, so it is part of the key.
+    cache_key = llm_cache_key(
+        f"{model}>{escalation_model}@{settings.llm.LLM_EXTRACT_MIN_CONFIDENCE}",
+        EXTRACT_SYSTEM_PROMPT,
+        raw_text,
+        CategorySchema.model_json_schema(),
+    )
+    if settings.cache.LLM_CACHE_ENABLED:
+        cached = await asyncio.to_thread(extract_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        category = await _extract_with_model(model, raw_text, "extract_resume")
+        problem = extraction_problem(category)
+    except (ValidationError, LengthFinishReasonError, ContentFilterFinishReasonError) as e:
+        if escalation_model == model:
+            raise
+        category, problem = None, "invalid_output"
+        logger.warning(f"Extraction with {model} failed validation: {e}")
+
+    if problem and escalation_model != model:
+        logger.info(f"Escalating extraction from {model} to {escalation_model}: {problem}")
+        await increment_counters_async("llm_tiers", {"escalations": 1, f"escalations:{problem}": 1})
+        category = await _extract_with_model(escalation_model, raw_text, "extract_resume_escalation")
+    if category is None:
+        return {}
+
+    key_information = category.model_dump()  # type: ignore
+    if settings.cache.LLM_CACHE_ENABLED:
+        await asyncio.to_thread(extract_cache.set, cache_key, key_information)
+    return key_information
+
+
+async def analyze_resume_single_pass_async(raw_text: str) -> dict | None:
+    """Summary and key information from one structured call, as `ResumeAnalysisSchema` fields.
+
+    Returns None when the output is refused, invalid or fails `extraction_problem`.
+    """
+    model = settings.llm.LLM_ANALYZE_MODEL
+    cache_key = llm_cache_key(model, ANALYZE_SYSTEM_PROMPT, raw_text, ResumeAnalysisSchema.model_json_schema())
+    if settings.cache.LLM_CACHE_ENABLED:
+        cached = await asyncio.to_thread(analyze_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+    limiter = get_rate_limiter("openai", model)
+    started = time.perf_counter()
+    try:
+        async with llm_semaphore, limiter.limit(estimate_tokens(ANALYZE_SYSTEM_PROMPT, raw_text)) as lease:
+            response = await async_openai_client.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": ANALYZE_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Resume text: {raw_text}"},
+                ],
+                response_format=ResumeAnalysisSchema,
+            )
+            lease.used_tokens = response.usage.total_tokens if response.usage else None
+        await record_tier(model, time.perf_counter() - started)
+        await record_usage("analyze_resume", response.usage)
+        analysis = response.choices[0].message.parsed
+        problem = extraction_problem(analysis)
+    except (ValidationError, LengthFinishReasonError, ContentFilterFinishReasonError) as e:
+        analysis, problem = None, "invalid_output"
+        logger.warning(f"Single pass analysis with {model} failed validation: {e}")
+    if problem:
+        logger.info(f"Single pass analysis with {model} was not usable: {problem}")
+        await increment_counters_async("llm_tiers", {"escalations": 1, f"escalations:{problem}": 1})
+        return None
+
+    result = analysis.model_dump()  # type: ignore
+    if settings.cache.LLM_CACHE_ENABLED:
+        await asyncio.to_thread(analyze_cache.set, cache_key, result)
+    return result
+
+
+async def extract_contact_async(raw_text: str) -> dict:
+    """Name and contact fields from the top of a resume, with `LLM_EXTRACT_MODEL`.
+
+    Used for near-duplicates, which copy their other fields from the original.
+    Returns an empty dict when the output is refused or invalid.
+    """
+    model = settings.llm.LLM_EXTRACT_MODEL
+    text = await asyncio.to_thread(header_text, raw_text)
+    cache_key = llm_cache_key(model, CONTACT_SYSTEM_PROMPT, text, ContactSchema.model_json_schema())
+    if settings.cache.LLM_CACHE_ENABLED:
+        cached = await asyncio.to_thread(extract_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+    limiter = get_rate_limiter("openai", model)
+    started = time.perf_counter()
+    try:
+        async with llm_semaphore, limiter.limit(estimate_tokens(CONTACT_SYSTEM_PROMPT, text)) as lease:
+            response = await async_openai_client.chat.completions.parse(
+                model=model,
+                messages=[
+                    {"role": "system", "content": CONTACT_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Resume text: {text}"},
+                ],
+                response_format=ContactSchema,
+            )
+            lease.used_tokens = response.usage.total_tokens if response.usage else None
+    except (ValidationError, LengthFinishReasonError, ContentFilterFinishReasonError) as e:
+        logger.warning(f"Contact extraction with {model} failed validation: {e}")
+        return {}
+    await record_tier(model, time.perf_counter() - started)
+    await record_usage("extract_contact", response.usage)
+    contact = response.choices[0].message.parsed
+    if contact is None:
+        return {}
+
+    result = contact.model_dump()
+    if settings.cache.LLM_CACHE_ENABLED:
+        await asyncio.to_thread(extract_cache.set, cache_key, result)
+    return result
+
+
+def replace_contact_fields(summary: str, original: dict, contact: dict) -> str:
+    """Swap the original's contact values in a copied summary for the new resume's."""
+    for field in ContactSchema.model_fields:
+        old_value = (original.get(field) or "").strip()
+        if old_value:
+            summary = summary.replace(old_value, contact.get(field) or "")
+    return summary
+
+
+def summarize_resume(raw_text: str) -> str:
+    return run_async(summarize_resume_async(raw_text))
+
+
+def extract_resume(raw_text: str) -> dict:
+    return run_async(extract_resume_async(raw_text))
+
+
+async def _timed(stage, raw_text: str):
+    started = time.perf_counter()
+    result = await stage(raw_text)
+    return result, time.perf_counter() - started
+
+
+def prepare_resume_inputs(raw_text: str) -> tuple[PreparedText, PreparedText]:
+    """Normalize OCR text and fit it to the summary and extraction token budgets."""
+    if not settings.llm.LLM_TEXT_PREP_ENABLED:
+        tokens = count_tokens(raw_text, settings.llm.LLM_SUMMARY_MODEL)
+        unchanged = PreparedText(text=raw_text, raw_tokens=tokens, tokens=tokens)
+        return unchanged, unchanged
+
+    summary_input = prepare_text(
+        raw_text, settings.llm.LLM_SUMMARY_MAX_INPUT_TOKENS, SUMMARY_SECTIONS, settings.llm.LLM_SUMMARY_MODEL
+    )
+    extract_input = prepare_text(
+        raw_text, settings.llm.LLM_EXTRACT_MAX_INPUT_TOKENS, EXTRACT_SECTIONS, settings.llm.LLM_EXTRACT_MODEL
+    )
+    return summary_input, extract_input
+
+
+async def analyze_resume_single_pass(raw_text: str) -> tuple[str, dict, dict]:
+    """`single_pass` analysis: one structured call returns the summary and the extracted fields.
+
+    Output that `extraction_problem` rejects falls back to the two-call analysis,
+    which escalates the extraction to `LLM_EXTRACT_ESCALATION_MODEL`.
+    """
+    if settings.llm.LLM_TEXT_PREP_ENABLED:
+        analyze_input = await asyncio.to_thread(
+            prepare_text,
+            raw_text,
+            settings.llm.LLM_ANALYZE_MAX_INPUT_TOKENS,
+            SUMMARY_SECTIONS,
+            settings.llm.LLM_ANALYZE_MODEL,
+        )
+    else:
+        tokens = await asyncio.to_thread(count_tokens, raw_text, settings.llm.LLM_ANALYZE_MODEL)
+        analyze_input = PreparedText(text=raw_text, raw_tokens=tokens, tokens=tokens)
+    token_usage = {
+        "raw_tokens": analyze_input.raw_tokens,
+        "analyze_resume_tokens": analyze_input.tokens,
+        "saved_tokens": analyze_input.saved_tokens,
+    }
+    await increment_counters_async("llm_input_tokens", {"raw": analyze_input.raw_tokens, "sent": analyze_input.tokens})
+
+    result, seconds = await _timed(analyze_resume_single_pass_async, analyze_input.text)
+    if result is None:
+        return await analyze_resume_two_calls(raw_text)
+    summary = result.pop("summary")
+
+    await increment_counters_async("llm_stage_ms", {"single_pass_count": 1, "single_pass_wall": int(seconds * 1000)})
+    logger.info(
+        f"LLM single pass analysis took {seconds:.2f}s, "
+        f"saved {token_usage['saved_tokens']} of {analyze_input.raw_tokens} prompt tokens"
+    )
+    return summary, result, token_usage
+
+
+async def analyze_resume_async(raw_text: str) -> tuple[str, dict, dict]:
+    """Summarize the resume and extract its key information.
+
+    With `LLM_ANALYSIS_MODE=single_pass` one structured call returns both.
+    Otherwise summarization and extraction run as two concurrent calls.
+    Each call gets the resume text prepared for its own token budget. LLM calls
+    in a process share one connection pool and are bounded by
+    `LLM_STAGE_CONCURRENCY`. If either stage fails, the other is cancelled and
+    the error is raised. Returns the summary, the extracted fields and the
+    prompt token usage for the resume.
+    """
+    if settings.llm.LLM_ANALYSIS_MODE == "single_pass":
+        return await analyze_resume_single_pass(raw_text)
+    return await analyze_resume_two_calls(raw_text)
+
+
+async def analyze_resume_two_calls(raw_text: str) -> tuple[str, dict, dict]:
+    """Default analysis: summarization and extraction as two concurrent calls."""
+    summary_input, extract_input = await asyncio.to_thread(prepare_resume_inputs, raw_text)
+    token_usage = {
+        "raw_tokens": summary_input.raw_tokens,
+        "summarize_resume_tokens": summary_input.tokens,
+        "extract_resume_tokens": extract_input.tokens,
+        "saved_tokens": summary_input.saved_tokens + extract_input.saved_tokens,
+    }
+    await increment_counters_async(
+        "llm_input_tokens",
+        {
+            "raw": summary_input.raw_tokens + extract_input.raw_tokens,
+            "sent": summary_input.tokens + extract_input.tokens,
+        },
+    )
+
+    started = time.perf_counter()
+    summary_task = asyncio.create_task(_timed(summarize_resume_async, summary_input.text))
+    extract_task = asyncio.create_task(_timed(extract_resume_async, extract_input.text))
+
+    done, pending = await asyncio.wait([summary_task, extract_task], return_when=asyncio.FIRST_EXCEPTION)
+    for task in done:
+        if task.exception():
+            for pending_task in pending:
+                pending_task.cancel()
+            raise task.exception()  # type: ignore
+
+    summary, summary_seconds = summary_task.result()
+    key_information, extract_seconds = extract_task.result()
+    wall_seconds = time.perf_counter() - started
+
+    await increment_counters_async(
+        "llm_stage_ms",
+        {
+            "count": 1,
+            "summarize_resume": int(summary_seconds * 1000),
+            "extract_resume": int(extract_seconds * 1000),
+            "wall": int(wall_seconds * 1000),
+        },
+    )
+    logger.info(
+        f"LLM stages took {wall_seconds:.2f}s wall "
+        f"(summarize {summary_seconds:.2f}s, extract {extract_seconds:.2f}s), "
+        f"saved {token_usage['saved_tokens']} of {2 * summary_input.raw_tokens} prompt tokens"
+    )
+    return summary, key_information, token_usage
+
+
+def analyze_resume(raw_text: str) -> tuple[str, dict, dict]:
+    """Sync entry point for `analyze_resume_async`, run on the shared background loop."""
+    return run_async(analyze_resume_async(raw_text))
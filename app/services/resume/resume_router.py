@@ -1,85 +1,213 @@
 import os
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, UploadFile
-from sqlmodel import Session, desc, select
-
-from app.database.engine import db_session
-from app.database.models import Resume
-from app.modules.vector import query_resume_from_vector_db
-from app.services.resume.resume_methods import validate_pdf_file
+import anyio
+from celery import group
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.settings import settings
+from app.database.engine import async_db_session
+from app.database.models import Resume, ResumeContent, ResumeStatus
+from app.services.resume.resume_match import match_resumes
+from app.services.resume.resume_methods import (
+    extract_pdfs_from_zip,
+    is_pdf_upload,
+    is_zip_upload,
+    save_upload_file,
+    validate_pdf_file,
+)
 from app.services.resume.resume_schema import (
+    BatchProgressResponse,
+    BulkUploadResponse,
     FileUploadResponse,
+    MatchResumeRequest,
     QueryResumeRequest,
-    ResumeResponse,
+    ResumeListResponse,
+    ResumeMatchHit,
+    ResumeMatchResponse,
+    ResumeSearchHit,
+    ResumeSearchId,
     ResumeSingleResponse,
+    SearchMode,
+    SearchProjection,
 )
-from app.services.resume.resume_service import create_resume
-from app.services.resume.resume_tasks import process_resume
+from app.services.resume.resume_search import query_vector_db, search_resumes
+from app.services.resume.resume_service import create_resume, create_resume_batch, get_batch_progress, list_resumes
+from app.services.resume.resume_tasks import resume_job
+from app.utils.generate_ids import generate_id
 
 resume_router = APIRouter(prefix="/resumes", tags=["resume"])
 
 
-@resume_router.get("/", response_model=list[ResumeResponse])
+@resume_router.get("/", response_model=ResumeListResponse)
 async def get_resumes(
-    db: Session = Depends(db_session),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    status: ResumeStatus | None = None,
+    category: str | None = None,
+    skills_all: list[str] = Query(default=[], description="Resumes must have every one of these skills"),
+    skills_any: list[str] = Query(default=[], description="Resumes must have at least one of these skills"),
+    db: AsyncSession = Depends(async_db_session),
 ):
-    statement = select(Resume).order_by(desc(Resume.created_at))
-    resumes = db.exec(statement).all()
-    return resumes
+    resumes, next_cursor = await list_resumes(
+        db,
+        limit=limit,
+        cursor=cursor,
+        status=status,
+        category=category,
+        skills_all=skills_all,
+        skills_any=skills_any,
+    )
+    return ResumeListResponse(items=resumes, next_cursor=next_cursor)  # type: ignore
 
 
 @resume_router.get("/{resume_id}", response_model=ResumeSingleResponse)
 async def get_resume(
     resume_id: str,
-    db: Session = Depends(db_session),
+    db: AsyncSession = Depends(async_db_session),
 ):
-    statement = select(Resume).where(Resume.id == resume_id)
-    resume = db.exec(statement).first()
-    return resume
+    statement = (
+        select(Resume, ResumeContent.summary)
+        .outerjoin(ResumeContent, ResumeContent.resume_id == Resume.id)  # type: ignore
+        .where(Resume.id == resume_id)
+    )
+    row = (await db.exec(statement)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    resume, summary = row
+    return {**resume.model_dump(), "summary": summary or ""}
 
 
 @resume_router.post("/query")
 async def query_resume(
     body: QueryResumeRequest,
+    db: AsyncSession = Depends(async_db_session),
+):
+    if body.mode == SearchMode.VECTOR:
+        hits = await query_vector_db(db, body)
+    else:
+        hits = await search_resumes(db, body)
+    if body.projection == SearchProjection.IDS:
+        return [ResumeSearchId.model_validate(hit) for hit in hits]
+    return [ResumeSearchHit.model_validate(hit) for hit in hits]
+
+
+@resume_router.post("/match", response_model=ResumeMatchResponse)
+async def match_resume(
+    body: MatchResumeRequest,
+    db: AsyncSession = Depends(async_db_session),
 ):
-    results = query_resume_from_vector_db(body.query)
-    return results
+    hits, total, skills = await match_resumes(db, body)
+    return ResumeMatchResponse(items=[ResumeMatchHit.model_validate(hit) for hit in hits], total=total, skills=skills)
 
 
 @resume_router.post("/", response_model=FileUploadResponse)
 async def upload_resume(
     file: Annotated[UploadFile, Depends(validate_pdf_file)],
-    db: Session = Depends(db_session),
+    force_reprocess: bool = Query(default=False, description="Process the resume even if it is a near-duplicate"),
+    db: AsyncSession = Depends(async_db_session),
 ):
-    contents = await file.read()
     original_filename = file.filename or "unknown_file.pdf"
 
     file_extension = os.path.splitext(original_filename)[1]
 
-    resume = create_resume(
-        file_name=original_filename,
-        file_path="",
-        db=db,
-    )
-
-    new_filename = f"{resume.id}{file_extension}"
-    file_path = f"public/resumes/{new_filename}"
-
-    resume.file_name = new_filename
-    resume.file_path = file_path
-    db.add(resume)
-    db.commit()
-    db.refresh(resume)
+    upload_dir = settings.app_settings.UPLOAD_DIR
+    resume_id = generate_id()
+    new_filename = f"{resume_id}{file_extension}"
+    file_path = f"{upload_dir}/{new_filename}"
 
-    os.makedirs("public/resumes", exist_ok=True)
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    await anyio.Path(upload_dir).mkdir(parents=True, exist_ok=True)
+    content_hash = await save_upload_file(file, file_path)
 
+    resume = await create_resume(
+        resume_id=resume_id,
+        file_name=new_filename,
+        file_path=file_path,
+        content_hash=content_hash,
+        db=db,
+    )
 
-    process_resume.delay(resume.id) #type: ignore
+    resume_job(resume.id, force_reprocess).apply_async()  # type: ignore
     return FileUploadResponse(
         message="Resume uploaded successfully",
         file_name=new_filename,
         file_path=file_path,
     )
+
+
+@resume_router.post("/batches", response_model=BulkUploadResponse)
+async def upload_resume_batch(
+    files: list[UploadFile] = File(..., description="PDF files and/or zip archives of PDF files"),
+    force_reprocess: bool = Query(default=False, description="Process resumes even if they are near-duplicates"),
+    db: AsyncSession = Depends(async_db_session),
+):
+    upload_dir = settings.app_settings.UPLOAD_DIR
+    max_files = settings.app_settings.BULK_UPLOAD_MAX_FILES
+    await anyio.Path(upload_dir).mkdir(parents=True, exist_ok=True)
+
+    stored: list[dict] = []
+    skipped: list[str] = []
+    try:
+        for file in files:
+            if len(stored) >= max_files:
+                skipped.append(file.filename or "")
+            elif is_pdf_upload(file):
+                resume_id = generate_id()
+                file_path = f"{upload_dir}/{resume_id}.pdf"
+                try:
+                    content_hash = await save_upload_file(file, file_path)
+                except HTTPException as e:
+                    # An oversized PDF is skipped like an oversized archive member, not fatal to the batch.
+                    if e.status_code != 413:
+                        raise
+                    skipped.append(file.filename or "")
+                    continue
+                stored.append(
+                    {
+                        "resume_id": resume_id,
+                        "file_name": f"{resume_id}.pdf",
+                        "file_path": file_path,
+                        "content_hash": content_hash,
+                    }
+                )
+            elif is_zip_upload(file):
+                archive_path = f"{upload_dir}/{generate_id()}.zip"
+                await save_upload_file(file, archive_path, max_bytes=settings.app_settings.UPLOAD_MAX_ARCHIVE_BYTES)
+                try:
+                    extracted, skipped_members = await run_in_threadpool(
+                        extract_pdfs_from_zip, archive_path, upload_dir, max_files - len(stored), file.filename or ""
+                    )
+                finally:
+                    await anyio.Path(archive_path).unlink(missing_ok=True)
+                stored.extend(extracted)
+                skipped.extend(skipped_members)
+            else:
+                skipped.append(file.filename or "")
+
+        if not stored:
+            raise HTTPException(status_code=400, detail="No PDF files found in upload.")
+
+        batch_id = generate_id()
+        resumes = await create_resume_batch(batch_id=batch_id, files=stored, db=db)
+    except BaseException:
+        for file in stored:
+            await anyio.Path(file["file_path"]).unlink(missing_ok=True)
+        raise
+
+    group(resume_job(resume.id, force_reprocess) for resume in resumes).apply_async()  # type: ignore
+    return BulkUploadResponse(batch_id=batch_id, total=len(resumes), skipped=skipped)
+
+
+@resume_router.get("/batches/{batch_id}", response_model=BatchProgressResponse)
+async def get_resume_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(async_db_session),
+):
+    progress = await get_batch_progress(batch_id, db)
+    total = sum(progress.values())
+    if total == 0:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return BatchProgressResponse(batch_id=batch_id, total=total, **progress)
@@ -1,11 +1,18 @@
+from enum import Enum
+
 from pydantic import BaseModel, Field
 
+from app.database.models import ResumeStatus
+
 
-class CategorySchema(BaseModel):
+class ContactSchema(BaseModel):
     full_name: str = Field(description="Full name of the person")
     email: str = Field(description="Email of the person")
     phone: str = Field(description="Phone number of the person")
     address: str = Field(description="Address of the person")
+
+
+class CategorySchema(ContactSchema):
     category: str = Field(description="Category of the person")
     skills: list[str] = Field(description="List of skills of the person")
     strength: list[str] = Field(description="List of strength of the person, direct and concise maximum 5 words each")
@@ -14,8 +21,18 @@ class CategorySchema(BaseModel):
             "List of weakness of the person, direct and concise maximum 5 words each"
             "If the person has any, return empty list"
         ))
+    confidence: float = Field(
+        description="Confidence from 0 to 1 that the category and contact fields are correct and complete"
+    )
 
 
+class ResumeAnalysisSchema(CategorySchema):
+    summary: str = Field(
+        description=(
+            "Concise bullet point summary of the resume, one '- ' line per point, covering personal information, "
+            "education, work experience, skills, projects, certifications, interests and references"
+        ))
+
 
 class FileUploadResponse(BaseModel):
     message: str
@@ -23,8 +40,60 @@ class FileUploadResponse(BaseModel):
     file_path: str
 
 
+class BulkUploadResponse(BaseModel):
+    batch_id: str
+    total: int
+    skipped: list[str]
+
+
+class BatchProgressResponse(BaseModel):
+    batch_id: str
+    total: int
+    pending: int
+    processing: int
+    completed: int
+
+
+class SearchMode(str, Enum):
+    VECTOR = "vector"
+    KEYWORD = "keyword"
+    HYBRID = "hybrid"
+
+
+class SearchProjection(str, Enum):
+    IDS = "ids"
+    METADATA = "metadata"
+    SNIPPETS = "snippets"
+    FULL = "full"
+
+
 class QueryResumeRequest(BaseModel):
     query:str
+    mode: SearchMode = SearchMode.VECTOR
+    projection: SearchProjection = Field(
+        default=SearchProjection.FULL,
+        description=(
+            "ids: ids and scores; metadata: resume fields; snippets: resume fields and highlighted text snippets; "
+            "full: resume fields and the whole resume text. Every mode returns the same fields"
+        ),
+    )
+    limit: int = Field(default=5, ge=1, le=50)
+    offset: int = Field(default=0, ge=0, le=500)
+    category: str | None = None
+    status: ResumeStatus | None = None
+    skills: list[str] = Field(default_factory=list)
+
+
+class MatchResumeRequest(BaseModel):
+    job_description: str = Field(min_length=1)
+    skills: list[str] = Field(
+        default_factory=list,
+        description="Skills to score overlap on; defaults to known skills found in the job description",
+    )
+    category: str | None = None
+    skills_all: list[str] = Field(default_factory=list, description="Candidates must have every one of these skills")
+    limit: int = Field(default=20, ge=1, le=100)
+    offset: int = Field(default=0, ge=0, le=1000)
 
 
 class ResumeResponse(BaseModel):
@@ -37,6 +106,36 @@ class ResumeResponse(BaseModel):
     skills: list[str]
     status: str
     file_path: str
+    duplicate_of: str | None = None
+
+
+class ResumeListResponse(BaseModel):
+    items: list[ResumeResponse]
+    next_cursor: str | None = None
+
+
+class ResumeSearchHit(ResumeResponse):
+    score: float
+    snippet: str | None = None
+    content: str | None = None
+
+
+class ResumeSearchId(BaseModel):
+    id: str
+    score: float
+
+
+class ResumeMatchHit(ResumeResponse):
+    score: float
+    similarity: float
+    skill_overlap: float
+    matched_skills: list[str]
+
+
+class ResumeMatchResponse(BaseModel):
+    items: list[ResumeMatchHit]
+    total: int
+    skills: list[str]
 
 
 class ResumeSingleResponse(ResumeResponse):
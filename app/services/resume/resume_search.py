@@ -0,0 +1,139 @@
+import asyncio
+
+from sqlalchemy import func
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.settings import settings
+from app.database.models import Resume, ResumeContent, ResumeStatus
+from app.modules.vector import query_resume_from_vector_db
+from app.services.resume.resume_schema import QueryResumeRequest, SearchMode, SearchProjection
+from app.services.resume.resume_service import RESUME_LIST_COLUMNS, apply_resume_filters
+
+SEARCH_LANGUAGE = "english"
+RRF_K = 60
+SNIPPET_OPTIONS = "MaxFragments=2, MaxWords=25, MinWords=10, StartSel=<mark>, StopSel=</mark>"
+
+
+def build_search_vector(raw_resume: str, summary: str, skills: list[str]):
+    """SQL expression for the full-text document; skills rank above the summary and the summary above raw text."""
+    return (
+        func.setweight(func.to_tsvector(SEARCH_LANGUAGE, " ".join(skills)), "A")
+        .op("||")(func.setweight(func.to_tsvector(SEARCH_LANGUAGE, summary), "B"))
+        .op("||")(func.setweight(func.to_tsvector(SEARCH_LANGUAGE, raw_resume), "C"))
+    )
+
+
+async def keyword_search(db: AsyncSession, body: QueryResumeRequest, limit: int) -> list[str]:
+    tsquery = func.websearch_to_tsquery(SEARCH_LANGUAGE, body.query)
+    rank = func.ts_rank_cd(ResumeContent.search_vector, tsquery)
+    statement = (
+        select(Resume.id)
+        .join(ResumeContent, col(ResumeContent.resume_id) == Resume.id)
+        .where(col(ResumeContent.search_vector).op("@@")(tsquery))
+    )
+    statement = apply_resume_filters(statement, body.status, body.category, skills_all=body.skills)
+    statement = statement.order_by(rank.desc()).limit(limit)
+    return list((await db.exec(statement)).all())
+
+
+async def vector_search(body: QueryResumeRequest, limit: int) -> list[tuple[str, float]]:
+    """Nearest resume ids with their score, 1 / (1 + distance), so closer resumes score higher."""
+    # Only completed resumes are indexed, so any other status cannot match.
+    if body.status and body.status != ResumeStatus.COMPLETED:
+        return []
+
+    where = {"category": body.category} if body.category else None
+    hits = await run_in_threadpool(query_resume_from_vector_db, body.query, limit, where, ("distances",))
+    return [(hit["resume_id"], 1.0 / (1.0 + hit["distance"])) for hit in hits]
+
+
+async def fetch_snippets(db: AsyncSession, resume_ids: list[str], query: str) -> dict[str, str]:
+    """Highlighted fragments of each resume's text around the query terms, built by Postgres."""
+    if not resume_ids:
+        return {}
+    tsquery = func.websearch_to_tsquery(SEARCH_LANGUAGE, query)
+    statement = select(
+        ResumeContent.resume_id,
+        func.ts_headline(SEARCH_LANGUAGE, func.coalesce(ResumeContent.raw_resume, ""), tsquery, SNIPPET_OPTIONS),
+    ).where(col(ResumeContent.resume_id).in_(resume_ids))
+    return dict((await db.exec(statement)).all())  # type: ignore
+
+
+async def query_vector_db(db: AsyncSession, body: QueryResumeRequest) -> list[dict]:
+    """Nearest resumes from Chroma, projected like keyword and hybrid results.
+
+    Filters match keyword and hybrid mode: only completed resumes are indexed,
+    and skill filters are applied in Postgres to a candidate window larger
+    than the requested page.
+    """
+    window = body.offset + body.limit
+    if body.skills:
+        window *= settings.vector.HYBRID_CANDIDATE_MULTIPLIER
+    ranked = await vector_search(body, window)
+    if body.skills:
+        matching = set(await filter_by_skills(db, [resume_id for resume_id, _ in ranked], body.skills))
+        ranked = [(resume_id, score) for resume_id, score in ranked if resume_id in matching]
+    return await project_hits(db, body, ranked[body.offset : body.offset + body.limit])
+
+
+async def project_hits(db: AsyncSession, body: QueryResumeRequest, page: list[tuple[str, float]]) -> list[dict]:
+    """Ranked (id, score) pairs shaped by the projection; every search mode returns the same fields.
+
+    `ids` returns only ids and scores. The other projections add the resume
+    fields from Postgres, `snippets` adds highlighted fragments and `full` adds
+    the whole resume text.
+    """
+    if not page or body.projection == SearchProjection.IDS:
+        return [{"id": resume_id, "score": score} for resume_id, score in page]
+
+    resume_ids = [resume_id for resume_id, _ in page]
+    statement = select(*RESUME_LIST_COLUMNS)
+    if body.projection == SearchProjection.FULL:
+        statement = statement.add_columns(col(ResumeContent.raw_resume).label("content")).outerjoin(
+            ResumeContent, col(ResumeContent.resume_id) == Resume.id
+        )
+    statement = statement.where(col(Resume.id).in_(resume_ids))
+    rows = {row.id: dict(row._mapping) for row in (await db.exec(statement)).all()}  # type: ignore
+    if body.projection == SearchProjection.SNIPPETS:
+        snippets = await fetch_snippets(db, resume_ids, body.query)
+        for resume_id, row in rows.items():
+            row["snippet"] = snippets.get(resume_id, "")
+    return [{**rows[resume_id], "score": score} for resume_id, score in page if resume_id in rows]
+
+
+async def filter_by_skills(db: AsyncSession, resume_ids: list[str], skills: list[str]) -> list[str]:
+    # Chroma metadata cannot hold the skill list, so vector hits are filtered in Postgres.
+    if not resume_ids or not skills:
+        return resume_ids
+    statement = apply_resume_filters(select(Resume.id).where(col(Resume.id).in_(resume_ids)), skills_all=skills)
+    matching = set((await db.exec(statement)).all())
+    return [resume_id for resume_id in resume_ids if resume_id in matching]
+
+
+def reciprocal_rank_fusion(*rankings: list[str]) -> list[tuple[str, float]]:
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, resume_id in enumerate(ranking, start=1):
+            scores[resume_id] = scores.get(resume_id, 0.0) + 1.0 / (RRF_K + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+async def search_resumes(db: AsyncSession, body: QueryResumeRequest) -> list[dict]:
+    """Rank resumes by full-text, vector or fused (reciprocal rank fusion) relevance.
+
+    Filters are applied inside each retriever so both sides only return
+    eligible resumes, and each side contributes a candidate window larger than
+    the requested page.
+    """
+    window = (body.offset + body.limit) * settings.vector.HYBRID_CANDIDATE_MULTIPLIER
+    if body.mode == SearchMode.KEYWORD:
+        ranked = reciprocal_rank_fusion(await keyword_search(db, body, window))
+    else:
+        # The Chroma lookup runs in a worker thread while Postgres answers the keyword side.
+        keyword_ids, vector_hits = await asyncio.gather(keyword_search(db, body, window), vector_search(body, window))
+        vector_ids = await filter_by_skills(db, [resume_id for resume_id, _ in vector_hits], body.skills)
+        ranked = reciprocal_rank_fusion(keyword_ids, vector_ids)
+
+    return await project_hits(db, body, ranked[body.offset : body.offset + body.limit])
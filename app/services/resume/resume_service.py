@@ -1,14 +1,130 @@
 from fastapi import Depends
-from sqlmodel import Session
+from sqlalchemy.dialects.postgresql import array
+from sqlmodel import col, desc, func, select, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database.engine import db_session
-from app.database.models import Resume
+from app.database.engine import async_db_session
+from app.database.models import Resume, ResumeStatus
+from app.services.resume.resume_methods import decode_cursor, encode_cursor
+from app.utils.simhash import hamming_distance, simhash_bands
+from app.utils.skills import canonicalize_skills
 
+RESUME_LIST_COLUMNS = (
+    Resume.id,
+    Resume.created_at,
+    Resume.fullname,
+    Resume.email,
+    Resume.phone,
+    Resume.address,
+    Resume.category,
+    Resume.skills,
+    Resume.status,
+    Resume.file_path,
+    Resume.duplicate_of,
+)
 
-def create_resume(file_name:str,file_path:str,
-    db: Session = Depends(db_session)):
-        resume = Resume(file_name=file_name, file_path=file_path) #type: ignore
+
+async def create_resume(resume_id: str, file_name: str, file_path: str, content_hash: str,
+    db: AsyncSession = Depends(async_db_session)):
+        resume = Resume(id=resume_id, file_name=file_name, file_path=file_path, content_hash=content_hash) #type: ignore
         db.add(resume)
-        db.commit()
-        db.refresh(resume)
+        await db.commit()
+        await db.refresh(resume)
         return resume
+
+
+async def create_resume_batch(batch_id: str, files: list[dict], db: AsyncSession) -> list[Resume]:
+    """Insert one resume row per stored file in a single transaction."""
+    resumes = [
+        Resume(
+            id=file["resume_id"],
+            file_name=file["file_name"],
+            file_path=file["file_path"],
+            content_hash=file["content_hash"],
+            batch_id=batch_id,
+        )  # type: ignore
+        for file in files
+    ]
+    db.add_all(resumes)
+    await db.commit()
+    return resumes
+
+
+async def get_batch_progress(batch_id: str, db: AsyncSession) -> dict[str, int]:
+    statement = select(Resume.status, func.count()).where(Resume.batch_id == batch_id).group_by(Resume.status)
+    counts = {status.value: count for status, count in (await db.exec(statement)).all()}
+    return {status.value: counts.get(status.value, 0) for status in ResumeStatus}
+
+
+async def find_near_duplicate(
+    db: AsyncSession, resume_id: str, fingerprint: int, max_distance: int, max_candidates: int
+) -> str | None:
+    """Id of the closest completed resume whose SimHash is within `max_distance` bits.
+
+    Candidates share at least two SimHash bands, found through the GIN index on the band
+    pairs. At most `max_candidates` of them are compared, so resumes built from a common
+    template cannot make the lookup scan a large part of the table.
+    """
+    statement = (
+        select(Resume.id, Resume.simhash)
+        .where(
+            Resume.id != resume_id,
+            Resume.status == ResumeStatus.COMPLETED,
+            col(Resume.simhash_bands).overlap(simhash_bands(fingerprint)),
+        )
+        .limit(max_candidates)
+    )
+    best_id, best_distance = None, max_distance + 1
+    for candidate_id, candidate_simhash in (await db.exec(statement)).all():
+        distance = hamming_distance(fingerprint, candidate_simhash)
+        if distance < best_distance:
+            best_id, best_distance = candidate_id, distance
+    return best_id
+
+
+def apply_resume_filters(statement, status=None, category=None, skills_all=None, skills_any=None):
+    """Add resume filters; skill filters match canonical skill keys through the GIN index."""
+    if status:
+        statement = statement.where(Resume.status == status)
+    if category:
+        statement = statement.where(Resume.category == category)
+    if skills_all:
+        statement = statement.where(col(Resume.skill_keys).contains(canonicalize_skills(skills_all)))
+    if skills_any:
+        statement = statement.where(col(Resume.skill_keys).has_any(array(canonicalize_skills(skills_any))))
+    return statement
+
+
+async def list_resumes(
+    db: AsyncSession,
+    limit: int,
+    cursor: str | None = None,
+    status: ResumeStatus | None = None,
+    category: str | None = None,
+    skills_all: list[str] | None = None,
+    skills_any: list[str] | None = None,
+) -> tuple[list[dict], str | None]:
+    """Return one page of resumes, newest first, and the cursor for the next page.
+
+    Pages are keyed on (created_at, id) so each request is an index range scan
+    regardless of how deep the client has paged. Only the listed columns are
+    selected; the large text columns are never read.
+    """
+    statement = apply_resume_filters(
+        select(*RESUME_LIST_COLUMNS),
+        status=status,
+        category=category,
+        skills_all=skills_all,
+        skills_any=skills_any,
+    )
+    if cursor:
+        created_at, resume_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(Resume.created_at, Resume.id) < tuple_(created_at, resume_id))
+    statement = statement.order_by(desc(Resume.created_at), desc(Resume.id)).limit(limit + 1)
+
+    rows = [dict(row._mapping) for row in (await db.exec(statement)).all()]  # type: ignore
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
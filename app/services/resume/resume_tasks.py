@@ -1,90 +1,318 @@
+import asyncio
+
+from celery import Task, chain
 from loguru import logger
-from sqlmodel import Session, select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.celery import app
-from app.database.engine import engine
-from app.database.models import Resume, ResumeStatus
-from app.modules.ocr import extract_text_from_pdf
-from app.modules.vector import add_resume_to_vector_db
-from app.services.resume.resume_methods import extract_resume, summarize_resume
+from app.core.settings import settings
+from app.database.engine import async_engine, engine
+from app.database.models import Resume, ResumeContent, ResumeStatus
+from app.modules.ocr import extract_text_from_pdf_async
+from app.modules.text_prep import normalize_ocr_text
+from app.modules.vector import add_resume_to_vector_db, get_resume_embedding
+from app.services.resume.resume_methods import analyze_resume_async, extract_contact_async, replace_contact_fields
+from app.services.resume.resume_search import build_search_vector
+from app.services.resume.resume_service import find_near_duplicate
+from app.utils.event_loop import LoopSemaphore, run_async
+from app.utils.metrics import increment_counter_async
+from app.utils.simhash import simhash, simhash_bands, to_signed64
+from app.utils.skills import canonicalize_skills
 
 # from app.utils.websocker_helper import publish_message
 
+resume_job_semaphore = LoopSemaphore(settings.worker.WORKER_MAX_INFLIGHT)
+
+
+class ResumeProcessingError(Exception):
+    """A resume that cannot be processed; retrying the stage will not help."""
+
 
-@app.task
-def process_resume(resume_id: str):
-    try:
-        logger.info(f"Processing resume {resume_id}")
-        # publish_message(resume_id, "Processing resume")
-        with Session(engine) as session:
-            statement = select(Resume).where(Resume.id == resume_id)
-            resume = session.exec(statement).first()
-            if resume:
-                resume.status = ResumeStatus.PROCESSING
-                session.add(resume)
-                session.commit()
-
-                file_path = resume.file_path
-                file_name = resume.file_name
-
-                if not file_path or not file_name:
-                   raise ValueError(f"Resume {resume_id} has missing file_path or file_name")
-
-
-
-                # publish_message(resume_id, "Extracting text from resume")
-                logger.info(f"Extracting text from {file_name}")
-                texts = extract_text_from_pdf(file_name, file_path)
-
-                # publish_message(resume_id, "Extracting information from resume")
-                logger.info(f"Extracting information from {file_name}")
-                summarized = summarize_resume(texts)
-
-                # publish_message(resume_id, "Extracting key information from resume")
-                logger.info(f"Extracting key information from {file_name}")
-                key_information = extract_resume(texts)
-
-                resume.fullname = key_information.get("full_name")
-                resume.email = key_information.get("email")
-                resume.phone = key_information.get("phone")
-                resume.address = key_information.get("address")
-                resume.category = key_information.get("category")
-                resume.skills = key_information.get("skills", [])
-                resume.strength = key_information.get("strength", [])
-                resume.summary = summarized
-                resume.raw_resume = texts
-                resume.status = ResumeStatus.COMPLETED
-                session.add(resume)
-                session.commit()
-
-                # publish_message(resume_id, "Insert resume to vector db")
-                logger.info(f"Insert resume to vector db {resume_id}")
-
-                # Validate that category exists
-                category = key_information.get("category")
-                if not category:
-                    raise ValueError(f"Resume {resume_id} extraction failed: missing category")
-
-                add_resume_to_vector_db(
-                    resume_id=resume_id,
-                    category=category,
-                    resume_text=texts,
-                )
-
-                # publish_message(resume_id, "completed")
-                return "success"
-    except Exception as e:
-        logger.error(f"Error processing resume {resume_id}: {e}")
+class ResumeStageTask(Task):
+    """Base for resume pipeline stages.
+
+    Stages retry with exponential backoff. Each stage persists its output before
+    the next one runs, so a retry only repeats the failed stage. Once retries are
+    exhausted the resume is reset to PENDING.
+    """
+
+    autoretry_for = (Exception,)
+    dont_autoretry_for = (ResumeProcessingError,)
+    max_retries = settings.worker.RESUME_TASK_MAX_RETRIES
+    retry_backoff = True
+    retry_backoff_max = settings.worker.RESUME_TASK_RETRY_BACKOFF_MAX
+    retry_jitter = True
+    acks_late = True
+    reject_on_worker_lost = True
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        resume_id = args[0] if args else kwargs.get("resume_id")
+        logger.error(f"Resume {resume_id} failed at {self.name}: {exc}")
         try:
             with Session(engine) as session:
-                statement = select(Resume).where(Resume.id == resume_id)
-                resume = session.exec(statement).first()
+                resume = session.get(Resume, resume_id)
                 if resume:
                     resume.status = ResumeStatus.PENDING
                     session.add(resume)
                     session.commit()
         except Exception as db_error:
             logger.error(f"Failed to update resume status on error: {db_error}")
-        return "error"
-    finally:
-        logger.info(f"Finished processing resume {resume_id}")
+
+
+# Stages are coroutines on the shared background loop. Sessions are closed before
+# OCR and LLM calls so a connection is never held while waiting on the network.
+
+
+def resume_session() -> AsyncSession:
+    return AsyncSession(async_engine, expire_on_commit=False)
+
+
+async def get_resume_content(session: AsyncSession, resume_id: str) -> ResumeContent:
+    return await session.get(ResumeContent, resume_id) or ResumeContent(resume_id=resume_id)
+
+
+async def link_near_duplicate(resume_id: str, raw_resume: str, force_reprocess: bool = False) -> None:
+    """Store the SimHash of the resume text and link the resume to its closest completed near-duplicate."""
+    fingerprint = await asyncio.to_thread(simhash, raw_resume)
+    async with resume_session() as session:
+        resume = await session.get(Resume, resume_id)
+        if not resume:
+            raise ResumeProcessingError(f"Resume {resume_id} not found")
+
+        resume.simhash = to_signed64(fingerprint)
+        resume.simhash_bands = simhash_bands(fingerprint)
+        resume.duplicate_of = None
+        if settings.dedup.DEDUP_ENABLED and not force_reprocess:
+            resume.duplicate_of = await find_near_duplicate(
+                session,
+                resume_id,
+                fingerprint,
+                settings.dedup.DEDUP_MAX_HAMMING_DISTANCE,
+                settings.dedup.DEDUP_MAX_CANDIDATES,
+            )
+        if resume.duplicate_of:
+            logger.info(f"Resume {resume_id} is a near-duplicate of {resume.duplicate_of}")
+            await increment_counter_async("dedup", "near_duplicates")
+        session.add(resume)
+        await session.commit()
+
+
+async def ocr_stage(resume_id: str, force_reprocess: bool = False) -> None:
+    async with resume_session() as session:
+        resume = await session.get(Resume, resume_id)
+        if not resume:
+            raise ResumeProcessingError(f"Resume {resume_id} not found")
+
+        resume.status = ResumeStatus.PROCESSING
+        session.add(resume)
+        await session.commit()
+
+        content = await get_resume_content(session, resume_id)
+        if content.raw_resume:
+            logger.info(f"Reusing extracted text for resume {resume_id}")
+            await link_near_duplicate(resume_id, content.raw_resume, force_reprocess)
+            return
+
+    if not resume.file_path or not resume.file_name:
+        raise ResumeProcessingError(f"Resume {resume_id} has missing file_path or file_name")
+
+    # publish_message(resume_id, "Extracting text from resume")
+    logger.info(f"Extracting text from {resume.file_name}")
+    raw_resume = await extract_text_from_pdf_async(resume.file_name, resume.file_path)
+
+    async with resume_session() as session:
+        content = await get_resume_content(session, resume_id)
+        content.raw_resume = raw_resume
+        session.add(content)
+        await session.commit()
+
+    await link_near_duplicate(resume_id, raw_resume, force_reprocess)
+
+
+def same_text(text: str, other: str | None) -> bool:
+    return other is not None and normalize_ocr_text(text) == normalize_ocr_text(other)
+
+
+async def reuse_near_duplicate(raw_resume: str, original: ResumeContent) -> tuple[str, dict] | None:
+    """Summary and extracted fields for a near-duplicate of `original`, or None to analyze it in full.
+
+    Identical texts copy everything. Otherwise the fields that do not depend on
+    identity (category, skills, strength, weakness) are copied, and the name and
+    contact fields are extracted again from the top of the new text with the
+    cheap model. The copied summary gets the new contact values.
+    """
+    if original.extraction is None:
+        return None
+    if await asyncio.to_thread(same_text, raw_resume, original.raw_resume):
+        return original.summary or "", original.extraction
+
+    contact = await extract_contact_async(raw_resume)
+    if not contact.get("full_name"):
+        return None
+    await increment_counter_async("dedup", "reextracted_contacts")
+    return replace_contact_fields(original.summary or "", original.extraction, contact), {
+        **original.extraction,
+        **contact,
+    }
+
+
+async def analyze_stage(resume_id: str) -> None:
+    async with resume_session() as session:
+        resume = await session.get(Resume, resume_id)
+        content = await get_resume_content(session, resume_id)
+        original = None
+        if resume and resume.duplicate_of:
+            original = await session.get(ResumeContent, resume.duplicate_of)
+    if content.extraction is not None:
+        logger.info(f"Reusing extracted information for resume {resume_id}")
+        return
+    if not content.raw_resume:
+        raise ResumeProcessingError(f"Resume {resume_id} has no extracted text")
+
+    reused = await reuse_near_duplicate(content.raw_resume, original) if original else None
+    if original and reused:
+        logger.info(f"Reusing extracted information from near-duplicate {original.resume_id} for resume {resume_id}")
+        await increment_counter_async("dedup", "reused_extractions")
+        async with resume_session() as session:
+            content = await get_resume_content(session, resume_id)
+            content.summary, content.extraction = reused
+            session.add(content)
+            await session.commit()
+        return
+
+    # publish_message(resume_id, "Extracting information from resume")
+    logger.info(f"Extracting information from resume {resume_id}")
+    summarized, key_information, token_usage = await analyze_resume_async(content.raw_resume)
+
+    if not key_information.get("category"):
+        raise ResumeProcessingError(f"Resume {resume_id} extraction failed: missing category")
+
+    async with resume_session() as session:
+        content = await get_resume_content(session, resume_id)
+        content.summary = summarized
+        content.extraction = key_information
+        content.token_usage = token_usage
+        session.add(content)
+        await session.commit()
+
+
+async def persist_stage(resume_id: str) -> None:
+    async with resume_session() as session:
+        resume = await session.get(Resume, resume_id)
+        content = await session.get(ResumeContent, resume_id)
+        if not resume or not content or content.extraction is None:
+            raise ResumeProcessingError(f"Resume {resume_id} has no extracted information")
+
+        key_information = content.extraction
+        resume.fullname = key_information.get("full_name")
+        resume.email = key_information.get("email")
+        resume.phone = key_information.get("phone")
+        resume.address = key_information.get("address")
+        resume.category = key_information.get("category")
+        resume.skills = key_information.get("skills", [])
+        resume.skill_keys = canonicalize_skills(resume.skills or [])
+        resume.strength = key_information.get("strength", [])
+        resume.status = ResumeStatus.COMPLETED
+        session.add(resume)
+        content.search_vector = build_search_vector(  # type: ignore
+            content.raw_resume or "", content.summary or "", resume.skills or []
+        )
+        session.add(content)
+        await session.commit()
+
+
+async def index_stage(resume_id: str) -> None:
+    async with resume_session() as session:
+        resume = await session.get(Resume, resume_id)
+        content = await session.get(ResumeContent, resume_id)
+    if not resume or not content or not resume.category:
+        raise ResumeProcessingError(f"Resume {resume_id} is not ready for indexing")
+
+    embedding = None
+    if resume.duplicate_of:
+        embedding = await asyncio.to_thread(get_resume_embedding, resume.duplicate_of)
+        if embedding is not None:
+            await increment_counter_async("dedup", "reused_embeddings")
+
+    # publish_message(resume_id, "Insert resume to vector db")
+    logger.info(f"Insert resume to vector db {resume_id}")
+    # Wait for the write, so the stage only succeeds (and the task is acked) once the resume is in the vector db.
+    # Adding may flush a full batch inline (embedding request, upsert, rate limiter sleep), so keep it off the loop.
+    written = await asyncio.to_thread(
+        add_resume_to_vector_db,
+        resume_id=resume_id,
+        category=resume.category,
+        resume_text=content.raw_resume,  # type: ignore
+        embedding=embedding,
+    )
+    await asyncio.wrap_future(written)
+    # publish_message(resume_id, "completed")
+    logger.info(f"Finished processing resume {resume_id}")
+
+
+async def process_resume_async(resume_id: str, force_reprocess: bool = False) -> None:
+    """Run every stage in order within one job, bounded by `WORKER_MAX_INFLIGHT` jobs per process."""
+    async with resume_job_semaphore:
+        await ocr_stage(resume_id, force_reprocess)
+        for stage in (analyze_stage, persist_stage, index_stage):
+            await stage(resume_id)
+
+
+@app.task(base=ResumeStageTask, name="resume.ocr")
+def ocr_resume(resume_id: str, force_reprocess: bool = False):
+    run_async(ocr_stage(resume_id, force_reprocess))
+    return resume_id
+
+
+@app.task(base=ResumeStageTask, name="resume.analyze")
+def analyze_resume_text(resume_id: str):
+    run_async(analyze_stage(resume_id))
+    return resume_id
+
+
+@app.task(base=ResumeStageTask, name="resume.persist")
+def persist_resume(resume_id: str):
+    run_async(persist_stage(resume_id))
+    return resume_id
+
+
+@app.task(base=ResumeStageTask, name="resume.index")
+def index_resume(resume_id: str):
+    run_async(index_stage(resume_id))
+    return resume_id
+
+
+def resume_pipeline(resume_id: str, force_reprocess: bool = False):
+    """Chain of resume processing stages, each routed to its own queue."""
+    return chain(
+        ocr_resume.si(resume_id, force_reprocess),
+        analyze_resume_text.si(resume_id),
+        persist_resume.si(resume_id),
+        index_resume.si(resume_id),
+    )
+
+
+@app.task(base=ResumeStageTask)
+def process_resume(resume_id: str, force_reprocess: bool = False):
+    """Process a resume.
+
+    In the default `threads` worker mode this enqueues the staged pipeline. In
+    `asyncio` mode the whole job runs here as a coroutine on the worker's event
+    loop, and the task thread only waits for it.
+
+    Near-duplicates of a completed resume reuse its extracted information and
+    embedding unless `force_reprocess` is set.
+    """
+    logger.info(f"Processing resume {resume_id}")
+    if settings.worker.WORKER_MODE == "asyncio":
+        run_async(process_resume_async(resume_id, force_reprocess))
+    else:
+        resume_pipeline(resume_id, force_reprocess).apply_async()
+
+
+def resume_job(resume_id: str, force_reprocess: bool = False):
+    """Signature to dispatch for a new resume in the configured worker mode."""
+    if settings.worker.WORKER_MODE == "asyncio":
+        return process_resume.si(resume_id, force_reprocess)
+    return resume_pipeline(resume_id, force_reprocess)
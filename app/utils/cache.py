@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.core.settings import settings
+from app.utils.metrics import increment_counter, read_counters, with_hit_rate
+from app.utils.redis_client import redis_client
+
+
+def hash_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LRUTTLCache:
+    """Thread-safe in-process cache bounded by entry count and entry age.
+
+    Hits and misses are counted under the `cache:<namespace>` metric.
+    """
+
+    def __init__(self, namespace: str, max_entries: int, ttl_seconds: float):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def metric_name(self) -> str:
+        return f"cache:{self.namespace}"
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        increment_counter(self.metric_name, "hit" if entry is not None else "miss")
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return with_hit_rate(read_counters(self.metric_name))
+
+
+class TieredCache:
+    """JSON value cache with a local disk tier in front of a shared Redis tier.
+
+    Both tiers expire entries after `ttl_seconds`. The disk tier is bounded by
+    `max_bytes` and evicts least recently used entries; Redis relies on the
+    TTL and skips entries larger than `CACHE_REDIS_MAX_ENTRY_BYTES`.
+    Hits and misses are counted under the `cache:<namespace>` metric.
+    """
+
+    def __init__(self, namespace: str, max_bytes: int, ttl_seconds: int):
+        self.namespace = namespace
+        self.directory = Path(settings.cache.CACHE_DIR) / namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._disk_usage: int | None = None
+
+    @property
+    def metric_name(self) -> str:
+        return f"cache:{self.namespace}"
+
+    def get(self, key: str) -> Any | None:
+        value = self._disk_get(key)
+        if value is not None:
+            increment_counter(self.metric_name, "disk_hit")
+            return value
+
+        value = self._redis_get(key)
+        if value is not None:
+            increment_counter(self.metric_name, "redis_hit")
+            self._disk_set(key, value)
+            return value
+
+        increment_counter(self.metric_name, "miss")
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self._disk_set(key, value)
+        self._redis_set(key, value)
+
+    def stats(self) -> dict:
+        return with_hit_rate(read_counters(self.metric_name))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.metric_name}:{key}"
+
+    def _disk_get(self, key: str) -> Any | None:
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry["created_at"] > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+
+        # Reads refresh mtime so eviction drops the least recently used entries first.
+        os.utime(path)
+        return entry["value"]
+
+    def _disk_set(self, key: str, value: Any) -> None:
+        payload = json.dumps({"created_at": time.time(), "value": value}).encode()
+        if len(payload) > self.max_bytes:
+            return
+
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write {self.namespace} cache entry: {e}")
+            return
+
+        with self._lock:
+            if self._disk_usage is None:
+                self._disk_usage = sum(size for _, size, _ in self._scan_disk())
+            else:
+                self._disk_usage += len(payload)
+            if self._disk_usage > self.max_bytes:
+                self._evict_disk()
+
+    def _scan_disk(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_disk(self) -> None:
+        entries = sorted(self._scan_disk())
+        usage = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if usage <= target:
+                break
+            path.unlink(missing_ok=True)
+            usage -= size
+        self._disk_usage = usage
+
+    def _redis_get(self, key: str) -> Any | None:
+        try:
+            raw = redis_client.get(self._redis_key(key))
+        except RedisError as e:
+            logger.warning(f"Failed to read {self.namespace} cache from redis: {e}")
+            return None
+        if raw is None:
+            return None
+        return json.loads(raw)  # type: ignore
+
+    def _redis_set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value)
+        if len(payload) > settings.cache.CACHE_REDIS_MAX_ENTRY_BYTES:
+            return
+        try:
+            redis_client.set(self._redis_key(key), payload, ex=self.ttl_seconds)
+        except RedisError as e:
+            logger.warning(f"Failed to write {self.namespace} cache to redis: {e}")
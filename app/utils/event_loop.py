@@ -0,0 +1,67 @@
+import asyncio
+import os
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundEventLoop:
+    """An event loop running on a daemon thread, shared by every thread in the process.
+
+    Sync code (Celery tasks, thread pools) submits coroutines with `run`, so
+    async clients and their connection pools are multiplexed on one loop
+    instead of each thread holding its own connections.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="event-loop", daemon=True).start()
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def reset(self) -> None:
+        """Forget the parent's loop after fork; its thread does not exist in the child."""
+        self._loop = None
+        self._lock = threading.Lock()
+
+
+class LoopSemaphore:
+    """asyncio.Semaphore that is recreated when used from a new event loop, e.g. after fork."""
+
+    def __init__(self, value: int):
+        self.value = value
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _get(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._semaphore is None:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.value)
+        return self._semaphore
+
+    async def __aenter__(self):
+        await self._get().acquire()
+
+    async def __aexit__(self, *exc_info):
+        self._get().release()
+
+
+background_loop = BackgroundEventLoop()
+os.register_at_fork(after_in_child=background_loop.reset)
+
+
+def run_async(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Run a coroutine on the shared background loop and wait for its result."""
+    return background_loop.run(coro, timeout)
@@ -1,9 +1,63 @@
+import httpx
 from mistralai import Mistral
-from openai import OpenAI
-from tavily import TavilyClient
+from mistralai.utils import BackoffStrategy, RetryConfig
+from openai import AsyncOpenAI, OpenAI
+from tavily import AsyncTavilyClient, TavilyClient
 
 from app.core.settings import settings
+from app.utils.rate_limiter import on_response, on_response_async
 
-openai_client = OpenAI(api_key=settings.llm.OPENAI_API_KEY)
-mistral_client = Mistral(api_key=settings.llm.MISTRAL_API_KEY)
+http_limits = httpx.Limits(
+    max_connections=settings.llm.LLM_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.llm.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.llm.LLM_HTTP_KEEPALIVE_EXPIRY,
+)
+http_timeout = httpx.Timeout(settings.llm.LLM_READ_TIMEOUT, connect=settings.llm.LLM_CONNECT_TIMEOUT)
+
+# One connection pool per process for each of sync and async callers, shared by the OpenAI and Mistral SDKs.
+# The async pool must only be used from the shared background loop (app.utils.event_loop).
+http_client = httpx.Client(
+    limits=http_limits,
+    timeout=http_timeout,
+    follow_redirects=True,
+    event_hooks={"response": [on_response]},
+)
+async_http_client = httpx.AsyncClient(
+    limits=http_limits,
+    timeout=http_timeout,
+    follow_redirects=True,
+    event_hooks={"response": [on_response_async]},
+)
+
+mistral_retry_config = RetryConfig(
+    "backoff",
+    BackoffStrategy(
+        initial_interval=settings.llm.LLM_RETRY_BACKOFF_INITIAL_MS,
+        max_interval=settings.llm.LLM_RETRY_BACKOFF_MAX_MS,
+        exponent=2,
+        max_elapsed_time=settings.llm.LLM_RETRY_MAX_ELAPSED_MS,
+    ),
+    retry_connection_errors=True,
+)
+
+openai_client = OpenAI(
+    api_key=settings.llm.OPENAI_API_KEY,
+    http_client=http_client,
+    timeout=http_timeout,
+    max_retries=settings.llm.LLM_MAX_RETRIES,
+)
+async_openai_client = AsyncOpenAI(
+    api_key=settings.llm.OPENAI_API_KEY,
+    http_client=async_http_client,
+    timeout=http_timeout,
+    max_retries=settings.llm.LLM_MAX_RETRIES,
+)
+mistral_client = Mistral(
+    api_key=settings.llm.MISTRAL_API_KEY,
+    client=http_client,
+    async_client=async_http_client,
+    retry_config=mistral_retry_config,
+    timeout_ms=int(settings.llm.LLM_READ_TIMEOUT * 1000),
+)
 tavily_client = TavilyClient(api_key=settings.llm.TAVILY_API_KEY)
+async_tavily_client = AsyncTavilyClient(api_key=settings.llm.TAVILY_API_KEY)
@@ -0,0 +1,49 @@
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.utils.redis_client import get_async_redis_client, redis_client
+
+METRICS_PREFIX = "metrics"
+
+
+def increment_counter(name: str, field: str, amount: int = 1) -> None:
+    """Increment a counter shared by the API and worker processes."""
+    try:
+        redis_client.hincrby(f"{METRICS_PREFIX}:{name}", field, amount)
+    except RedisError as e:
+        logger.debug(f"Failed to increment metric {name}.{field}: {e}")
+
+
+async def increment_counter_async(name: str, field: str, amount: int = 1) -> None:
+    """`increment_counter` for coroutines, without blocking the event loop."""
+    try:
+        await get_async_redis_client().hincrby(f"{METRICS_PREFIX}:{name}", field, amount)  # type: ignore
+    except RedisError as e:
+        logger.debug(f"Failed to increment metric {name}.{field}: {e}")
+
+
+async def increment_counters_async(name: str, amounts: dict[str, int]) -> None:
+    """Increment several fields of one counter in a single round trip, without blocking the event loop."""
+    try:
+        async with get_async_redis_client().pipeline(transaction=False) as pipeline:
+            for field, amount in amounts.items():
+                pipeline.hincrby(f"{METRICS_PREFIX}:{name}", field, amount)
+            await pipeline.execute()
+    except RedisError as e:
+        logger.debug(f"Failed to increment metric {name}: {e}")
+
+
+def read_counters(name: str) -> dict[str, int]:
+    try:
+        raw = redis_client.hgetall(f"{METRICS_PREFIX}:{name}")
+    except RedisError as e:
+        logger.warning(f"Failed to read metric {name}: {e}")
+        return {}
+    return {key.decode(): int(value) for key, value in raw.items()}  # type: ignore
+
+
+def with_hit_rate(counters: dict[str, int]) -> dict:
+    """Add a hit_rate to cache counters whose hit fields end in `hit`."""
+    hits = sum(value for key, value in counters.items() if key.endswith("hit"))
+    lookups = hits + counters.get("miss", 0)
+    return {**counters, "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
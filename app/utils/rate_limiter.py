@@ -0,0 +1,341 @@
+import asyncio
+import math
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+import httpx
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.core.settings import settings
+from app.utils.metrics import increment_counter, increment_counter_async
+from app.utils.redis_client import async_redis_client, redis_client
+
+# Token buckets for requests and tokens per minute, refilled at `factor` times the
+# configured quota, plus a set of in-flight leases that expire if a process dies
+# without releasing them. Returns 0 when a lease was taken, otherwise the
+# milliseconds to wait before trying again.
+ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local concurrency = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'updated_at', 'factor', 'blocked_until')
+local blocked_until = tonumber(state[5]) or 0
+if now < blocked_until then
+    return blocked_until - now
+end
+
+local factor = tonumber(state[4]) or 1
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+local request_rate = rpm * factor
+local token_rate = tpm * factor
+local requests = math.min(request_rate, (tonumber(state[1]) or request_rate) + elapsed * request_rate / 60000)
+local tokens = math.min(token_rate, (tonumber(state[2]) or token_rate) + elapsed * token_rate / 60000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+local wait = 0
+if concurrency > 0 and redis.call('ZCARD', KEYS[2]) >= concurrency then
+    wait = tonumber(ARGV[7])
+end
+if rpm > 0 and requests < 1 then
+    wait = math.max(wait, math.ceil((1 - requests) * 60000 / request_rate))
+end
+if tpm > 0 then
+    cost = math.min(cost, token_rate)
+    if tokens < cost then
+        wait = math.max(wait, math.ceil((cost - tokens) * 60000 / token_rate))
+    end
+end
+if wait > 0 then
+    redis.call('HSET', KEYS[1], 'requests', requests, 'tokens', tokens, 'updated_at', now)
+    return wait
+end
+
+redis.call('HSET', KEYS[1], 'requests', requests - 1, 'tokens', tokens - cost, 'updated_at', now)
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[6]), ARGV[5])
+redis.call('PEXPIRE', KEYS[1], 3600000)
+redis.call('PEXPIRE', KEYS[2], tonumber(ARGV[6]))
+return 0
+"""
+
+# Frees the lease, settles the token estimate against actual usage and additively
+# recovers the rate factor after a request that was not throttled.
+RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[2], ARGV[1])
+local refund = tonumber(ARGV[2])
+if refund ~= 0 then
+    redis.call('HINCRBYFLOAT', KEYS[1], 'tokens', refund)
+end
+if ARGV[3] == '1' then
+    local factor = tonumber(redis.call('HGET', KEYS[1], 'factor')) or 1
+    redis.call('HSET', KEYS[1], 'factor', math.min(1, factor + tonumber(ARGV[4])))
+end
+return 0
+"""
+
+# Multiplicatively reduces the rate factor and blocks new leases for the
+# Retry-After period. A burst of 429s within one second counts as one decrease.
+THROTTLE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'factor', 'decreased_at', 'blocked_until')
+local factor = tonumber(state[1]) or 1
+if now - (tonumber(state[2]) or 0) > 1000 then
+    factor = math.max(tonumber(ARGV[2]), factor * tonumber(ARGV[3]))
+    redis.call('HSET', KEYS[1], 'factor', factor, 'decreased_at', now)
+end
+redis.call('HSET', KEYS[1], 'blocked_until', math.max(tonumber(state[3]) or 0, now + tonumber(ARGV[1])))
+return 0
+"""
+
+acquire_script = redis_client.register_script(ACQUIRE_SCRIPT)
+release_script = redis_client.register_script(RELEASE_SCRIPT)
+throttle_script = redis_client.register_script(THROTTLE_SCRIPT)
+async_acquire_script = async_redis_client.register_script(ACQUIRE_SCRIPT)
+async_release_script = async_redis_client.register_script(RELEASE_SCRIPT)
+async_throttle_script = async_redis_client.register_script(THROTTLE_SCRIPT)
+
+
+class RateLimitLease:
+    """An acquired request slot. Set `used_tokens` once the response reports usage."""
+
+    def __init__(self, limiter: "ProviderRateLimiter", lease_id: str | None, estimated_tokens: int):
+        self.limiter = limiter
+        self.lease_id = lease_id
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: int | None = None
+        self.throttled = False
+
+    @property
+    def refund(self) -> int:
+        if self.used_tokens is None or not self.limiter.tpm:
+            return 0
+        return min(self.estimated_tokens, self.limiter.tpm) - self.used_tokens
+
+
+current_lease: ContextVar[RateLimitLease | None] = ContextVar("current_rate_limit_lease", default=None)
+
+
+class ProviderRateLimiter:
+    """Redis-backed limiter shared by every process calling one provider model.
+
+    Enforces requests per minute, tokens per minute and concurrent requests;
+    a limit of 0 disables it. On a 429 the rate is cut by
+    `RATE_LIMIT_DECREASE_FACTOR` and new requests wait for Retry-After; each
+    successful request then recovers it by `RATE_LIMIT_RECOVERY_STEP`, so
+    throughput settles just under the provider's actual quota. If Redis is
+    unavailable, calls proceed unlimited.
+    """
+
+    def __init__(self, provider: str, model: str, rpm: int, tpm: int, concurrency: int):
+        self.provider = provider
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self.concurrency = concurrency
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+    @property
+    def keys(self) -> list[str]:
+        return [f"ratelimit:{self.name}", f"ratelimit:{self.name}:inflight"]
+
+    def _acquire_args(self, estimated_tokens: int, lease_id: str) -> list:
+        return [
+            self.rpm,
+            self.tpm,
+            self.concurrency,
+            estimated_tokens,
+            lease_id,
+            settings.rate_limit.RATE_LIMIT_LEASE_TTL_SECONDS * 1000,
+            settings.rate_limit.RATE_LIMIT_POLL_MS,
+        ]
+
+    def _release_args(self, lease: RateLimitLease) -> list:
+        return [lease.lease_id, lease.refund, 0 if lease.throttled else 1, settings.rate_limit.RATE_LIMIT_RECOVERY_STEP]
+
+    def _throttle_args(self, retry_after_ms: int) -> list:
+        return [
+            retry_after_ms,
+            settings.rate_limit.RATE_LIMIT_MIN_FACTOR,
+            settings.rate_limit.RATE_LIMIT_DECREASE_FACTOR,
+        ]
+
+    def _record_acquired(self, waited: float) -> None:
+        increment_counter("rate_limits", f"{self.name}:acquired")
+        increment_counter("rate_limits", f"{self.name}:wait_ms", int(waited * 1000))
+
+    async def _record_acquired_async(self, waited: float) -> None:
+        await increment_counter_async("rate_limits", f"{self.name}:acquired")
+        await increment_counter_async("rate_limits", f"{self.name}:wait_ms", int(waited * 1000))
+
+    async def acquire(self, estimated_tokens: int = 0) -> RateLimitLease:
+        lease_id = uuid.uuid4().hex
+        started = time.monotonic()
+        while True:
+            try:
+                wait_ms = await async_acquire_script(
+                    keys=self.keys, args=self._acquire_args(estimated_tokens, lease_id)
+                )
+            except RedisError as e:
+                logger.warning(f"Rate limiter for {self.name} unavailable, proceeding unlimited: {e}")
+                return RateLimitLease(self, None, estimated_tokens)
+            if not wait_ms:
+                await self._record_acquired_async(time.monotonic() - started)
+                return RateLimitLease(self, lease_id, estimated_tokens)
+            await asyncio.sleep(int(wait_ms) / 1000 * random.uniform(1, 1.2))  # type: ignore
+
+    async def release(self, lease: RateLimitLease) -> None:
+        if lease.lease_id is None:
+            return
+        try:
+            await async_release_script(keys=self.keys, args=self._release_args(lease))
+        except RedisError as e:
+            logger.warning(f"Failed to release rate limit lease for {self.name}: {e}")
+
+    async def throttle(self, retry_after_ms: int) -> None:
+        await increment_counter_async("rate_limits", f"{self.name}:throttled")
+        try:
+            await async_throttle_script(keys=self.keys, args=self._throttle_args(retry_after_ms))
+        except RedisError as e:
+            logger.warning(f"Failed to record throttling for {self.name}: {e}")
+
+    def acquire_sync(self, estimated_tokens: int = 0) -> RateLimitLease:
+        lease_id = uuid.uuid4().hex
+        started = time.monotonic()
+        while True:
+            try:
+                wait_ms = acquire_script(keys=self.keys, args=self._acquire_args(estimated_tokens, lease_id))
+            except RedisError as e:
+                logger.warning(f"Rate limiter for {self.name} unavailable, proceeding unlimited: {e}")
+                return RateLimitLease(self, None, estimated_tokens)
+            if not wait_ms:
+                self._record_acquired(time.monotonic() - started)
+                return RateLimitLease(self, lease_id, estimated_tokens)
+            time.sleep(int(wait_ms) / 1000 * random.uniform(1, 1.2))  # type: ignore
+
+    def release_sync(self, lease: RateLimitLease) -> None:
+        if lease.lease_id is None:
+            return
+        try:
+            release_script(keys=self.keys, args=self._release_args(lease))
+        except RedisError as e:
+            logger.warning(f"Failed to release rate limit lease for {self.name}: {e}")
+
+    def throttle_sync(self, retry_after_ms: int) -> None:
+        increment_counter("rate_limits", f"{self.name}:throttled")
+        try:
+            throttle_script(keys=self.keys, args=self._throttle_args(retry_after_ms))
+        except RedisError as e:
+            logger.warning(f"Failed to record throttling for {self.name}: {e}")
+
+    @asynccontextmanager
+    async def limit(self, estimated_tokens: int = 0):
+        if not settings.rate_limit.RATE_LIMIT_ENABLED:
+            yield RateLimitLease(self, None, estimated_tokens)
+            return
+
+        lease = await self.acquire(estimated_tokens)
+        token = current_lease.set(lease)
+        try:
+            yield lease
+        except Exception as e:
+            retry_after_ms = throttled_retry_after_ms(error_response(e))
+            if retry_after_ms is not None and not lease.throttled:
+                lease.throttled = True
+                await self.throttle(retry_after_ms)
+            raise
+        finally:
+            current_lease.reset(token)
+            await self.release(lease)
+
+    @contextmanager
+    def limit_sync(self, estimated_tokens: int = 0):
+        if not settings.rate_limit.RATE_LIMIT_ENABLED:
+            yield RateLimitLease(self, None, estimated_tokens)
+            return
+
+        lease = self.acquire_sync(estimated_tokens)
+        token = current_lease.set(lease)
+        try:
+            yield lease
+        except Exception as e:
+            retry_after_ms = throttled_retry_after_ms(error_response(e))
+            if retry_after_ms is not None and not lease.throttled:
+                lease.throttled = True
+                self.throttle_sync(retry_after_ms)
+            raise
+        finally:
+            current_lease.reset(token)
+            self.release_sync(lease)
+
+
+_rate_limiters: dict[str, ProviderRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str, model: str) -> ProviderRateLimiter:
+    """Limiter for `provider:model`, configured from `RATE_LIMITS` or `RATE_LIMIT_DEFAULT`."""
+    name = f"{provider}:{model}"
+    if name not in _rate_limiters:
+        limits = settings.rate_limit.RATE_LIMITS.get(name, settings.rate_limit.RATE_LIMIT_DEFAULT)
+        _rate_limiters[name] = ProviderRateLimiter(
+            provider=provider,
+            model=model,
+            rpm=limits.get("rpm", 0),
+            tpm=limits.get("tpm", 0),
+            concurrency=limits.get("concurrency", 0),
+        )
+    return _rate_limiters[name]
+
+
+def estimate_tokens(*texts: str, output_tokens: int | None = None) -> int:
+    """Rough token count for quota accounting; settled against reported usage on release."""
+    if output_tokens is None:
+        output_tokens = settings.rate_limit.RATE_LIMIT_OUTPUT_TOKENS_ESTIMATE
+    return sum(math.ceil(len(text) / 4) for text in texts) + output_tokens
+
+
+def error_response(error: Exception) -> httpx.Response | None:
+    response = getattr(error, "response", None) or getattr(error, "raw_response", None)
+    return response if isinstance(response, httpx.Response) else None
+
+
+def throttled_retry_after_ms(response: httpx.Response | None) -> int | None:
+    """Retry-After of a 429 response in milliseconds, or None if it was not throttled."""
+    if response is None or response.status_code != 429:
+        return None
+    for header, scale in (("retry-after-ms", 1), ("retry-after", 1000)):
+        try:
+            return int(float(response.headers[header]) * scale)
+        except (KeyError, ValueError):
+            continue
+    return int(settings.rate_limit.RATE_LIMIT_RETRY_AFTER_DEFAULT_SECONDS * 1000)
+
+
+# httpx response hooks for the shared LLM clients. They see every 429, including
+# those the SDKs retry internally, and throttle the limiter of the current call.
+
+
+def on_response(response: httpx.Response) -> None:
+    lease = current_lease.get()
+    retry_after_ms = throttled_retry_after_ms(response)
+    if lease is not None and retry_after_ms is not None:
+        lease.throttled = True
+        lease.limiter.throttle_sync(retry_after_ms)
+
+
+async def on_response_async(response: httpx.Response) -> None:
+    lease = current_lease.get()
+    retry_after_ms = throttled_retry_after_ms(response)
+    if lease is not None and retry_after_ms is not None:
+        lease.throttled = True
+        await lease.limiter.throttle(retry_after_ms)
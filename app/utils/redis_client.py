@@ -0,0 +1,34 @@
+import asyncio
+from weakref import WeakKeyDictionary
+
+import redis
+import redis.asyncio
+
+from app.core.settings import settings
+
+REDIS_TIMEOUTS = {
+    "socket_timeout": settings.database_settings.REDIS_SOCKET_TIMEOUT,
+    "socket_connect_timeout": settings.database_settings.REDIS_SOCKET_TIMEOUT,
+}
+
+redis_client = redis.Redis.from_url(settings.database_settings.REDIS_URL, **REDIS_TIMEOUTS)
+# Only used from the shared background event loop (app.utils.event_loop).
+async_redis_client = redis.asyncio.Redis.from_url(settings.database_settings.REDIS_URL, **REDIS_TIMEOUTS)
+
+_loop_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, redis.asyncio.Redis] = WeakKeyDictionary()
+
+
+def get_async_redis_client() -> redis.asyncio.Redis:
+    """Async client for the running event loop.
+
+    `redis.asyncio` connections belong to the loop that opened them, so code that
+    runs on both the API request loop and the shared background loop gets one
+    client per loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None:
+        client = _loop_clients[loop] = redis.asyncio.Redis.from_url(
+            settings.database_settings.REDIS_URL, **REDIS_TIMEOUTS
+        )
+    return client
@@ -0,0 +1,52 @@
+import hashlib
+import re
+from collections import Counter
+from itertools import combinations
+
+FINGERPRINT_BITS = 64
+FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+# Fingerprints are split into bands, and every pair of bands is one key for an indexed
+# lookup. Two fingerprints within BAND_COUNT - 2 bits of each other share at least two
+# bands exactly, so at least one key. A key is 16 bits wide, so unrelated fingerprints
+# rarely share one.
+BAND_COUNT = 8
+BAND_BITS = FINGERPRINT_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+SHINGLE_SIZE = 3
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> list[str]:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[index : index + size]) for index in range(len(words) - size + 1)]
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word shingles; texts with small edits differ in few bits."""
+    weights = [0] * FINGERPRINT_BITS
+    for shingle, count in Counter(shingles(text)).items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def simhash_bands(fingerprint: int) -> list[int]:
+    """One key per pair of bands, tagged with the pair's positions so equal values in different pairs differ."""
+    fingerprint &= FINGERPRINT_MASK
+    bands = [fingerprint >> (band * BAND_BITS) & BAND_MASK for band in range(BAND_COUNT)]
+    return [
+        (first * BAND_COUNT + second) << (2 * BAND_BITS) | bands[first] << BAND_BITS | bands[second]
+        for first, second in combinations(range(BAND_COUNT), 2)
+    ]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return ((a ^ b) & FINGERPRINT_MASK).bit_count()
+
+
+def to_signed64(fingerprint: int) -> int:
+    """Fingerprint as a signed 64-bit integer, to fit a Postgres BIGINT column."""
+    return fingerprint - (1 << FINGERPRINT_BITS) if fingerprint >> (FINGERPRINT_BITS - 1) else fingerprint
@@ -0,0 +1,36 @@
+import re
+
+SKILL_ALIASES = {
+    "golang": "go",
+    "postgresql": "postgres",
+    "psql": "postgres",
+    "k8s": "kubernetes",
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "py": "python",
+    "python3": "python",
+    "ml": "machine learning",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+}
+
+
+def canonicalize_skill(skill: str) -> str:
+    key = re.sub(r"\s+", " ", skill.strip().lower())
+    return SKILL_ALIASES.get(key, key)
+
+
+def canonicalize_skills(skills: list[str]) -> list[str]:
+    """Canonical, de-duplicated skill keys in first-seen order."""
+    keys = (canonicalize_skill(skill) for skill in skills)
+    return list(dict.fromkeys(key for key in keys if key))
@@ -0,0 +1,49 @@
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for multipart boundaries and part headers around the file bytes.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Cap request bodies on upload routes while they stream in.
+
+    Starlette spools a multipart body to a temporary file before the handler
+    runs, so a size check in the handler only sees the upload once it is
+    already on disk. A declared `Content-Length` over the limit is rejected
+    before the body is read; otherwise the bytes are counted as they arrive and
+    the request fails with 413 as soon as it passes the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[str, int]):
+        self.app = app
+        self.limits = {path.rstrip("/"): max_bytes for path, max_bytes in limits.items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_bytes = self.limits.get(scope["path"].rstrip("/")) if scope["type"] == "http" else None
+        if max_bytes is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload is too large. Maximum request size is {max_bytes} bytes."
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            response = JSONResponse({"detail": detail}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Raised inside the form parser, so FastAPI answers with this error.
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
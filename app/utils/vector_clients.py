@@ -4,7 +4,7 @@ from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 from app.core.settings import settings
 
 embedding_function = OpenAIEmbeddingFunction(
-    api_key=settings.llm.OPENAI_API_KEY, model_name="text-embedding-3-small"
+    api_key=settings.llm.OPENAI_API_KEY, model_name=settings.vector.EMBEDDING_MODEL
 )
 
-chroma_client = chromadb.PersistentClient(path="./chroma_db")
+chroma_client = chromadb.PersistentClient(path=settings.vector.CHROMA_PATH)
@@ -0,0 +1,59 @@
+"""Compare concurrent request throughput of the sync and async database sessions.
+
+Every simulated request runs from a coroutine, the way a FastAPI handler does,
+and issues one query that spends `--latency` seconds inside Postgres. The sync
+session blocks the event loop for the whole query, so requests are served one
+at a time; the async session lets them overlap up to the pool size.
+
+    uv run python -m benchmarks.db_concurrency --requests 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.engine import async_engine, engine
+
+
+async def sync_request(latency: float) -> None:
+    with Session(engine) as session:
+        session.exec(select(func.pg_sleep(latency))).one()
+
+
+async def async_request(latency: float) -> None:
+    async with AsyncSession(async_engine) as session:
+        (await session.exec(select(func.pg_sleep(latency)))).one()
+
+
+async def measure(request, requests: int, concurrency: int, latency: float) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            await request(latency)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds each query spends in Postgres")
+    args = parser.parse_args()
+
+    for name, request in (("sync session", sync_request), ("async session", async_request)):
+        throughput = await measure(request, args.requests, args.concurrency, args.latency)
+        print(f"{name:>14}: {throughput:8.1f} req/s")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
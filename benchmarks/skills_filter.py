@@ -0,0 +1,109 @@
+"""Benchmark skill filters over a synthetic set of resumes.
+
+Fills an unlogged `bench_resume_skills` table with `--rows` resumes (default
+1M), each holding six skills drawn from a skewed vocabulary, and compares:
+
+- loading every row and filtering skills in Python (the previous approach)
+- all-of (`skill_keys @> ...`) and any-of (`skill_keys ?| ...`) filters
+  answered through a GIN index, as `GET /resumes/` now runs them
+
+    uv run python -m benchmarks.skills_filter --rows 1000000
+"""
+
+import argparse
+import json
+import time
+
+from sqlalchemy import text
+
+from app.database.engine import engine
+
+TABLE = "bench_resume_skills"
+VOCABULARY = [
+    "python", "go", "postgres", "kubernetes", "aws", "docker", "javascript", "typescript", "react",
+    "node.js", "java", "spring", "c#", ".net", "c++", "rust", "scala", "spark", "kafka", "redis",
+    "mongodb", "mysql", "terraform", "ansible", "linux", "git", "graphql", "django", "fastapi", "flask",
+    "machine learning", "pytorch", "tensorflow", "pandas", "sql", "tableau", "excel", "figma",
+    "product management", "agile", "scrum", "jira", "seo", "salesforce", "hubspot", "negotiation",
+]  # fmt: skip
+ALL_OF = ["go", "postgres"]
+ANY_OF = ["rust", "scala"]
+
+
+def create_table(rows: int) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        connection.execute(
+            text(
+                f"CREATE UNLOGGED TABLE {TABLE} (id bigint PRIMARY KEY, skills json NOT NULL, skill_keys jsonb NOT NULL)"
+            )
+        )
+        # power(random(), 2) skews picks towards the front of the vocabulary, like real skill popularity.
+        connection.execute(
+            text(
+                f"""
+                INSERT INTO {TABLE}
+                SELECT g, to_json(picked.skills), to_jsonb(picked.skills)
+                FROM generate_series(1, :rows) AS g,
+                LATERAL (
+                    SELECT array_agg(DISTINCT vocabulary[1 + floor(power(random(), 2) * cardinality(vocabulary))::int])
+                        AS skills
+                    FROM generate_series(1, 6), (SELECT CAST(:vocabulary AS text[]) AS vocabulary) AS v
+                    WHERE g > 0
+                ) AS picked
+                """
+            ),
+            {"rows": rows, "vocabulary": VOCABULARY},
+        )
+        connection.execute(text(f"CREATE INDEX ix_{TABLE}_skill_keys ON {TABLE} USING gin (skill_keys)"))
+        connection.execute(text(f"ANALYZE {TABLE}"))
+
+
+def timed(label: str, run) -> None:
+    started = time.perf_counter()
+    matches = run()
+    print(f"{label:>32}: {matches:>8} matches in {time.perf_counter() - started:8.3f}s")
+
+
+def python_filter(required: set[str], match_all: bool) -> int:
+    matches = 0
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=10_000).execute(
+            text(f"SELECT skills FROM {TABLE}")
+        )
+        for (skills,) in result:
+            skill_set = {skill.lower() for skill in skills}
+            if (required <= skill_set) if match_all else (required & skill_set):
+                matches += 1
+    return matches
+
+
+def indexed_filter(condition: str, value) -> int:
+    with engine.connect() as connection:
+        return connection.execute(
+            text(f"SELECT count(*) FROM {TABLE} WHERE {condition}"), {"value": value}
+        ).scalar_one()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {TABLE} table afterwards")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    create_table(args.rows)
+    print(f"Created {args.rows} synthetic resumes in {time.perf_counter() - started:.1f}s")
+
+    timed(f"python all-of {ALL_OF}", lambda: python_filter(set(ALL_OF), match_all=True))
+    timed(f"gin all-of {ALL_OF}", lambda: indexed_filter("skill_keys @> CAST(:value AS jsonb)", json.dumps(ALL_OF)))
+    timed(f"python any-of {ANY_OF}", lambda: python_filter(set(ANY_OF), match_all=False))
+    timed(f"gin any-of {ANY_OF}", lambda: indexed_filter("skill_keys ?| CAST(:value AS text[])", ANY_OF))
+
+    if not args.keep:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE {TABLE}"))
+
+
+if __name__ == "__main__":
+    main()